@@ -0,0 +1,73 @@
+import os
+import shutil
+import sys
+import tempfile
+from dotenv import load_dotenv
+
+#* NOTE: Run from the repository root with `gunicorn`, which loads this file. Any setting can still be overridden on the command line.
+#* NOTE: Each worker has its own database pool, so keep GUNICORN_THREADS within DB_POOL_SIZE + DB_MAX_OVERFLOW.
+
+# The app reads its configuration when imported, which happens in the master before any worker is forked
+load_dotenv()
+
+wsgi_app = 'app:app'
+pythonpath = './src'
+bind = f'{ os.getenv( "HOST_ADDRESS", "0.0.0.0" ) }:{ os.getenv( "BIND_PORT", "5000" ) }'
+
+workers = int( os.getenv( "GUNICORN_WORKERS", str( os.cpu_count() or 1 ) ) )
+threads = int( os.getenv( "GUNICORN_THREADS", "4" ) )
+worker_class = os.getenv( "GUNICORN_WORKER_CLASS", "gthread" )
+preload_app = os.getenv( "GUNICORN_PRELOAD", "1" ) == '1'
+timeout = int( os.getenv( "GUNICORN_TIMEOUT", "30" ) )
+graceful_timeout = int( os.getenv( "GUNICORN_GRACEFUL_TIMEOUT", "30" ) )
+keepalive = int( os.getenv( "GUNICORN_KEEPALIVE", "5" ) )
+max_requests = int( os.getenv( "GUNICORN_MAX_REQUESTS", "0" ) )
+max_requests_jitter = int( os.getenv( "GUNICORN_MAX_REQUESTS_JITTER", "0" ) )
+accesslog = os.getenv( "GUNICORN_ACCESS_LOG" )
+
+# Workers write their metrics here so that /metrics aggregates all of them. It must be set before the app is imported.
+# Without an explicit directory, every run gets a fresh one, which is removed on exit.
+created_prometheus_dir = 'PROMETHEUS_MULTIPROC_DIR' not in os.environ
+if created_prometheus_dir:
+    os.environ[ 'PROMETHEUS_MULTIPROC_DIR' ] = tempfile.mkdtemp( prefix='api-prometheus-' )
+
+def on_starting( server ):
+    """Fails the jobs left unfinished by the previous run, once per start rather than once per worker."""
+    app_module = sys.modules.get( 'app' )
+    if app_module is not None:
+        app_module.fail_unfinished_jobs()
+        return
+
+    # Without preload the master never imports the app, so a handler is created just for this
+    from db_handler import DBhandler
+    db = DBhandler( os.getenv( "DB_URI", "" ), debug=False )
+    db.fail_unfinished_jobs( 'Interrupted by a server restart' )
+    db.dispose()
+
+def when_ready( server ):
+    """Closes the connections the master opened while preloading the app, before any worker is forked."""
+    app_module = sys.modules.get( 'app' )
+    if app_module is not None:
+        app_module.db.dispose()
+
+def post_fork( server, worker ):
+    """Gives a worker forked from the preloaded app its own database connections, HTTP sessions and thread pools."""
+    app_module = sys.modules.get( 'app' )
+    if app_module is not None:
+        app_module.init_worker()
+
+def worker_exit( server, worker ):
+    """Drains the worker's background jobs and upstream calls once it has finished its in-flight requests."""
+    app_module = sys.modules.get( 'app' )
+    if app_module is not None:
+        app_module.shutdown_app()
+
+def child_exit( server, worker ):
+    """Merges the metrics of an exited worker into the totals of dead workers."""
+    from prometheus_client import multiprocess
+    multiprocess.mark_process_dead( worker.pid )
+
+def on_exit( server ):
+    """Removes the metrics directory created for this run."""
+    if created_prometheus_dir:
+        shutil.rmtree( os.environ[ 'PROMETHEUS_MULTIPROC_DIR' ], ignore_errors=True )
@@ -1,18 +1,39 @@
 from os import getenv
 from random import randint
-from typing import Any
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, cast
 from dotenv import load_dotenv
-from flask import Flask, Response, request, jsonify, abort
+from flask import Flask, Response, request, jsonify, abort, stream_with_context
 from flask_cors import CORS
-from marshmallow import ValidationError
+from marshmallow import ValidationError, EXCLUDE
+from urllib.parse import urlsplit
 from uuid import UUID
 
-from db_handler import DBhandler
-from webhook_handler import CameraInterface, AnalyzerInterface
+from db_handler import DBhandler, FILTER_COLUMNS
+from webhook_handler import CameraInterface, AnalyzerInterface, CallbackInterface, CircuitBreaker
+from job_handler import JobHandler
+from json_provider import OrjsonProvider
+from compression import Compressor
+from metrics import instrument_app, render_metrics
+from profiler import RequestProfiler
 from sample_data_generator import DataGenerator
-from schemas import ImageSetsSchema, PatientsSchema, ImagesSchema, AssessmentsSchema
+from registry import TABLES, JOBS
+
+def env_float( name: str ) -> Optional[float]:
+    """Reads an optional number from the environment.
+
+    Args:
+        name ( str ): The name of the environment variable.
+
+    Returns:
+        Optional[float]: The value, or None if the variable is unset or empty.
+    """
+    value = getenv( name )
+    return float( value ) if value else None
 
 app: Flask = Flask( getenv( "APP_NAME", "API" ) )
+app.json = OrjsonProvider( app )
+instrument_app( app )
 cors: CORS = CORS( app )
 debug_mode: bool = getenv( "DEBUG_MODE", "0" ) == '1'
 host_address: str = getenv( "HOST_ADDRESS", "0.0.0.0" )
@@ -20,10 +41,209 @@ bind_port: int = int( getenv( "BIND_PORT", "5000" ) )
 
 schema_folder_path: str = getenv( "JSON_SCHEMA_FOLDER_PATH", "./src/sample-data-schemas" )
 max_samples: int = int( getenv( "MAX_SAMPLES", "5" ) )
+max_page_size: int = int( getenv( "MAX_PAGE_SIZE", "1000" ) )
+stream_chunk_size: int = int( getenv( "STREAM_CHUNK_SIZE", "1000" ) )
+bulk_chunk_size: int = int( getenv( "BULK_CHUNK_SIZE", "500" ) )
+sample_chunk_size: int = int( getenv( "SAMPLE_CHUNK_SIZE", "1000" ) )
+sample_processes: int = int( getenv( "SAMPLE_PROCESSES", "1" ) )
+slow_query_threshold_ms: Optional[float] = env_float( "SLOW_QUERY_THRESHOLD_MS" )
+#* NOTE: Job callbacks are only sent to these hosts, so clients cannot make the server post to internal addresses.
+callback_allowed_hosts: set = { host.strip().lower() for host in getenv( "CALLBACK_ALLOWED_HOSTS", "" ).split( ',' ) if host.strip() }
+
+if getenv( "COMPRESSION", "1" ) == '1':
+    Compressor(
+        app,
+        min_size=int( getenv( "COMPRESSION_MIN_SIZE", "1024" ) ),
+        gzip_level=int( getenv( "COMPRESSION_GZIP_LEVEL", "6" ) ),
+        brotli_quality=int( getenv( "COMPRESSION_BROTLI_QUALITY", "4" ) )
+    )
+
+if getenv( "PROFILING_TOKEN" ):
+    RequestProfiler(
+        app,
+        getenv( "PROFILING_TOKEN", "" ),
+        folder_path=getenv( "PROFILE_FOLDER_PATH", "./profiles" ),
+        interval=float( getenv( "PROFILE_INTERVAL_MS", "5" ) ) / 1000
+    )
+
+db = DBhandler(
+    getenv( "DB_URI", "" ),
+    debug=debug_mode,
+    pool_size=int( getenv( "DB_POOL_SIZE", "5" ) ),
+    max_overflow=int( getenv( "DB_MAX_OVERFLOW", "10" ) ),
+    pool_pre_ping=getenv( "DB_POOL_PRE_PING", "0" ) == '1',
+    pool_recycle=int( getenv( "DB_POOL_RECYCLE", "-1" ) ),
+    sqlite_pragmas={
+        'busy_timeout': int( getenv( "SQLITE_BUSY_TIMEOUT", "5000" ) ),
+        'cache_size': int( getenv( "SQLITE_CACHE_SIZE", "-64000" ) ),
+        'mmap_size': int( getenv( "SQLITE_MMAP_SIZE", "268435456" ) )
+    },
+    cache_size=int( getenv( "ENTITY_CACHE_SIZE", "1024" ) ),
+    cache_ttl=float( getenv( "ENTITY_CACHE_TTL", "30" ) ),
+    slow_query_threshold=slow_query_threshold_ms / 1000 if slow_query_threshold_ms is not None else None
+)
+ci = CameraInterface(
+    getenv( "CAMERA_INTERFACE_URL", "" ),
+    connect_timeout=float( getenv( "CAMERA_CONNECT_TIMEOUT", "3.05" ) ),
+    read_timeout=float( getenv( "CAMERA_READ_TIMEOUT", "10" ) ),
+    pool_size=int( getenv( "CAMERA_POOL_SIZE", "10" ) ),
+    retries=int( getenv( "CAMERA_RETRIES", "2" ) ),
+    backoff_factor=float( getenv( "CAMERA_BACKOFF_FACTOR", "0.25" ) ),
+    breaker=CircuitBreaker(
+        'camera',
+        failure_threshold=int( getenv( "CAMERA_BREAKER_FAILURES", "5" ) ),
+        latency_threshold=env_float( "CAMERA_BREAKER_LATENCY" ),
+        reset_timeout=float( getenv( "CAMERA_BREAKER_RESET", "30" ) )
+    ),
+    hedge_delay=env_float( "CAMERA_HEDGE_DELAY" ),
+    stream_url_ttl=float( getenv( "CAMERA_STREAM_URL_TTL", "300" ) ),
+    stream_url_retry_delay=float( getenv( "CAMERA_STREAM_URL_RETRY_DELAY", "5" ) ),
+    debug=debug_mode
+)
+ai = AnalyzerInterface(
+    getenv( "AI_INTERFACE_URL", "" ),
+    connect_timeout=float( getenv( "AI_CONNECT_TIMEOUT", "3.05" ) ),
+    read_timeout=float( getenv( "AI_READ_TIMEOUT", "10" ) ),
+    pool_size=int( getenv( "AI_POOL_SIZE", "10" ) ),
+    retries=int( getenv( "AI_RETRIES", "2" ) ),
+    backoff_factor=float( getenv( "AI_BACKOFF_FACTOR", "0.25" ) ),
+    max_concurrency=int( getenv( "AI_MAX_CONCURRENCY", "8" ) ),
+    breaker=CircuitBreaker(
+        'analyzer',
+        failure_threshold=int( getenv( "AI_BREAKER_FAILURES", "5" ) ),
+        latency_threshold=env_float( "AI_BREAKER_LATENCY" ),
+        reset_timeout=float( getenv( "AI_BREAKER_RESET", "30" ) )
+    ),
+    debug=debug_mode
+)
+sample_generators: Dict[ str, DataGenerator ] = {
+    name: DataGenerator( f'{ schema_folder_path }/{ name }.json', debug_mode | ( getenv( 'SAVE_SAMPLE_DATA_TO_JSON' ) is not None ), getenv( 'SAMPLE_DATA_JSON_SAVE_PATH' ) )
+    for name in ( 'all', 'assessments', 'images', 'sets', 'patients' )
+}
+cb = CallbackInterface( debug=debug_mode )
+jobs = JobHandler( db, max_workers=int( getenv( "JOB_WORKERS", "4" ) ), callback=cb, debug=debug_mode )
+
+def sample_data_response( name: str, num: int ) -> Response:
+    """Build a sample data response.
+
+    This function generates sample data with the named DataGenerator.
+    If the 'format=ndjson' query parameter is given, the samples are streamed as newline-delimited JSON
+    as they are generated, optionally seeded with the 'seed' query parameter.
+
+    Args:
+        name ( str ): The name of the sample data schema.
+        num ( int ): The number of samples to generate.
+
+    Returns:
+        Response: A JSON or NDJSON response containing the generated sample data.
+    """
+    datagen = sample_generators[ name ]
+
+    if request.args.get( 'format' ) == 'ndjson':
+        samples = datagen.stream_data( num, chunk_size=sample_chunk_size, processes=sample_processes, seed=request.args.get( 'seed', type=int ) )
+
+        if samples is None:
+            abort( 500, 'Sample data could not be generated' )
 
-db = DBhandler( getenv( "DB_URI", "" ), debug=debug_mode )
-ci = CameraInterface( getenv( "CAMERA_INTERFACE_URL", "" ), debug=debug_mode )
-ai = AnalyzerInterface( getenv( "AI_INTERFACE_URL", "" ), debug=debug_mode )
+        return Response( stream_with_context( f'{ app.json.dumps( sample ) }\n' for sample in samples ), mimetype='application/x-ndjson' )
+
+    sample_data = datagen.generate_data( num )
+    if sample_data is None:
+        abort( 500, 'Sample data could not be generated' )
+
+    return jsonify( sample_data )
+
+def entry_filters( table_name: str ) -> Dict[str, Any]:
+    """Parse the filter query parameters of a table listing.
+
+    Foreign key filters ( 'patient_id', 'set_id', 'image_id' ) must be UUIDs, 'assessment' must be 'true' or 'false',
+    and 'since' and 'until' must be ISO 8601 timestamps. Filters the table does not support are rejected.
+
+    Args:
+        table_name ( str ): The name of the table.
+
+    Returns:
+        Dict[str, Any]: The filter names and their parsed values.
+    """
+    supported = db.get_filter_names( table_name=table_name ) or []
+    filters = {}
+
+    for name in ( *FILTER_COLUMNS, 'since', 'until' ):
+        value = request.args.get( name )
+        if value is None:
+            continue
+
+        if name not in supported:
+            abort( 400, f"Table '{ table_name }' cannot be filtered by '{ name }'" )
+
+        try:
+            if name == 'assessment':
+                if value not in ( 'true', 'false' ):
+                    raise ValueError( value )
+                filters[ name ] = value == 'true'
+            elif name in ( 'since', 'until' ):
+                timestamp = datetime.fromisoformat( value )
+                if timestamp.tzinfo is not None:
+                    timestamp = timestamp.astimezone( timezone.utc ).replace( tzinfo=None )
+                filters[ name ] = timestamp
+            else:
+                filters[ name ] = UUID( value )
+        except ValueError:
+            abort( 400, f"Invalid value for '{ name }': '{ value }'" )
+
+    return filters
+
+def entry_fields( table_name: str ) -> Optional[List[str]]:
+    """Parse the 'fields' query parameter, a comma separated list of the columns to return.
+
+    Args:
+        table_name ( str ): The name of the table.
+
+    Returns:
+        Optional[List[str]]: The requested column names, or None if all columns are requested.
+    """
+    value = request.args.get( 'fields' )
+    if value is None:
+        return None
+
+    names = list( dict.fromkeys( name.strip() for name in value.split( ',' ) if name.strip() ) )
+    columns = TABLES[ table_name ].model.__table__.c
+
+    if not names:
+        abort( 400, "'fields' must list at least one column" )
+
+    unknown = [ name for name in names if name not in columns ]
+    if unknown:
+        abort( 400, f"Table '{ table_name }' has no fields { ', '.join( unknown ) }" )
+
+    return names
+
+def entry_callback_url() -> Optional[str]:
+    """Parse and validate the 'callback_url' query parameter.
+
+    Only http and https URLs on a host listed in CALLBACK_ALLOWED_HOSTS are accepted.
+    Aborts with a 400 status code if the URL is not allowed.
+
+    Returns:
+        Optional[str]: The callback URL, or None if none was requested.
+    """
+    callback_url = request.args.get( 'callback_url' )
+
+    if callback_url is None:
+        return None
+
+    try:
+        url = urlsplit( callback_url )
+        host = ( url.hostname or '' ).lower()
+    except ValueError:
+        abort( 400, 'Invalid callback_url' )
+
+    if url.scheme not in ( 'http', 'https' ):
+        abort( 400, 'callback_url must be an http or https URL' )
+    if host not in callback_allowed_hosts:
+        abort( 400, f"callback_url host '{ host }' is not allowed" )
+
+    return callback_url
 
 @app.route( '/generate', methods=['GET'] )
 def generate__all_sample_data() -> Response:
@@ -35,11 +255,7 @@ def generate__all_sample_data() -> Response:
     Returns:
         Response: A JSON response containing the generated sample data.
     """
-    datagen = DataGenerator( f'{ schema_folder_path }/all.json', debug_mode | ( getenv( 'SAVE_SAMPLE_DATA_TO_JSON' ) is not None ), getenv( 'SAMPLE_DATA_JSON_SAVE_PATH' ) )
-    sample_data = datagen.generate_data()
-    if sample_data is None:
-        abort( 500, 'Sample data could not be generated' )
-    return jsonify( sample_data )
+    return sample_data_response( 'all', request.args.get( 'num', 1, type=int ) )
 
 @app.route( '/generate/assessments', methods=['GET'] )
 def generate_assessments_sample_data() -> Response:
@@ -52,22 +268,12 @@ def generate_assessments_sample_data() -> Response:
         Response: A JSON response containing the generated sample data.
     """
     num = request.args.get( 'num', randint( 1, max_samples ), type=int )
-    datagen = DataGenerator( f'{ schema_folder_path }/assessments.json' or '', debug_mode | ( getenv( 'SAVE_SAMPLE_DATA_TO_JSON' ) is not None ), getenv( 'SAMPLE_DATA_JSON_SAVE_PATH' ) )
-    sample_data = datagen.generate_data( num )
-    if sample_data is None:
-        abort( 500, 'Sample data could not be generated' )
-
-    return jsonify( sample_data )
+    return sample_data_response( 'assessments', num )
 
 @app.route( '/generate/images', methods=['GET'] )
 def generate_images_sample_data() -> Response:
     num = request.args.get( 'num', randint( 1, max_samples ), type=int )
-    datagen = DataGenerator( f'{ schema_folder_path }/images.json' or '', debug_mode | ( getenv( 'SAVE_SAMPLE_DATA_TO_JSON' ) is not None ), getenv( 'SAMPLE_DATA_JSON_SAVE_PATH' ) )
-    sample_data = datagen.generate_data( num )
-    if sample_data is None:
-        abort( 500, 'Sample data could not be generated' )
-
-    return jsonify( sample_data )
+    return sample_data_response( 'images', num )
 
 @app.route( '/generate/sets', methods=['GET'] )
 def generate_sets_sample_data() -> Response:
@@ -80,12 +286,7 @@ def generate_sets_sample_data() -> Response:
         Response: A JSON response containing the generated sample data.
     """
     num = request.args.get( 'num', randint( 1, max_samples ), type=int )
-    datagen = DataGenerator( f'{ schema_folder_path }/sets.json' or '', debug_mode | ( getenv( 'SAVE_SAMPLE_DATA_TO_JSON' ) is not None ), getenv( 'SAMPLE_DATA_JSON_SAVE_PATH' ) )
-    sample_data = datagen.generate_data( num )
-    if sample_data is None:
-        abort( 500, 'Sample data could not be generated' )
-
-    return jsonify( sample_data )
+    return sample_data_response( 'sets', num )
 
 @app.route( '/generate/patients', methods=['GET'] )
 def generate_patients_sample_data() -> Response:
@@ -98,12 +299,7 @@ def generate_patients_sample_data() -> Response:
         Response: A JSON response containing the generated sample data.
     """
     num = request.args.get( 'num', randint( 1, max_samples ), type=int )
-    datagen = DataGenerator( f'{ schema_folder_path }/patients.json' or '', debug_mode | ( getenv( 'SAVE_SAMPLE_DATA_TO_JSON' ) is not None ), getenv( 'SAMPLE_DATA_JSON_SAVE_PATH' ) )
-    sample_data = datagen.generate_data( num )
-    if sample_data is None:
-        abort( 500, 'Sample data could not be generated' )
-
-    return jsonify( sample_data )
+    return sample_data_response( 'patients', num )
 
 @app.route( '/stream', methods=['GET'] )
 def get_stream_url() -> Response:
@@ -122,6 +318,41 @@ def get_stream_url() -> Response:
 
     return jsonify( { 'stream_url': camera_stream_url } )
 
+@app.route( '/cache/stats', methods=['GET'] )
+def get_cache_stats() -> Response:
+    """Get entry cache statistics.
+
+    This function retrieves the hit and miss counters of the database entry cache.
+
+    Returns:
+        Response: A JSON response containing the cache counters and configuration.
+    """
+    return jsonify( db.get_cache_stats() )
+
+@app.route( '/upstreams', methods=['GET'] )
+def get_upstream_stats() -> Response:
+    """Get upstream service health.
+
+    This function retrieves the circuit breaker state and counters of the camera and analysis services.
+
+    Returns:
+        Response: A JSON response containing the circuit state and counters of each upstream service.
+    """
+    return jsonify( { 'camera': ci.get_circuit_stats(), 'analyzer': ai.get_circuit_stats() } )
+
+@app.route( '/metrics', methods=['GET'] )
+def get_metrics() -> Response:
+    """Get the Prometheus metrics.
+
+    This function exposes request, database statement, connection pool and upstream service latencies
+    in the Prometheus text format, aggregated over all worker processes.
+
+    Returns:
+        Response: A text response containing the metrics.
+    """
+    data, content_type = render_metrics()
+    return Response( data, content_type=content_type )
+
 @app.route( '/patients', methods=['POST'] )
 def add_patient() -> Response:
     """Add a new patient.
@@ -133,8 +364,9 @@ def add_patient() -> Response:
         Response: A JSON response containing the metadata of the newly added patient.
     """
     patient_data: dict = request.get_json()
+    schema = TABLES[ 'patients' ].schema
+
     try:
-        schema = PatientsSchema()
         patient_data = schema.load( patient_data )
     except ValidationError as e:
         abort( 400, e.messages )
@@ -144,8 +376,6 @@ def add_patient() -> Response:
     if patient_metadata is None:
         abort( 500, 'Failed to insert new patient entry' )
 
-    schema = PatientsSchema()
-
     return jsonify( schema.dump( patient_metadata ) )
 
 @app.route( '/image_sets', methods=['POST'] )
@@ -159,8 +389,9 @@ def add_image_set() -> Response:
         Response: A JSON response containing the metadata of the newly added image set.
     """
     ids: dict = request.get_json()
+    schema = TABLES[ 'image_sets' ].schema
+
     try:
-        schema = ImageSetsSchema()
         ids = schema.load( ids )
     except ValidationError as e:
         abort( 400, e.messages )
@@ -170,44 +401,73 @@ def add_image_set() -> Response:
     if image_set_metadata is None:
         abort( 500, 'Failed to insert new image set entry' )
 
-    schema = ImageSetsSchema()
-
     return jsonify( schema.dump( image_set_metadata ) )
 
+def capture_image_entry( patient_data: dict ) -> Dict[ str, Any ]:
+    """Capture an image and store it.
+
+    This function uses the CameraInterface to capture an image and adds its metadata to the database.
+
+    Args:
+        patient_data ( dict ): The validated patient data sent to the camera.
+
+    Raises:
+        RuntimeError: If the image could not be captured or stored.
+
+    Returns:
+        Dict[ str, Any ]: The serialized metadata of the newly captured image.
+    """
+    image_data = ci.capture_image( payload=patient_data )
+
+    if image_data is None:
+        raise RuntimeError( 'Failed to capture image' )
+
+    try:
+        image_data = TABLES[ 'images' ].import_schema.load( { **image_data, **patient_data }, unknown=EXCLUDE )
+    except ValidationError as e:
+        raise RuntimeError( f'Invalid image data: { e.messages }' )
+
+    image_metadata = db.create_entry( data=image_data, table_name='images' )
+
+    if image_metadata is None:
+        raise RuntimeError( 'Failed to insert new image entry' )
+
+    return cast( dict, TABLES[ 'images' ].schema.dump( image_metadata ) )
+
 @app.route( '/images', methods=['POST'] )
-def take_image() -> Response:
+def take_image() -> Response | tuple[ Response, int ]:
     """Take a new image.
 
     This function captures a new image and adds it to the database.
     It receives patient data in JSON format, uses the PatientsSchema to validate it,
     and then uses the CameraInterface to capture the image.
+    If the 'async' query parameter is set, the capture runs as a background job instead,
+    and the optional 'callback_url' query parameter is notified when it finishes. Its host must be listed in CALLBACK_ALLOWED_HOSTS.
 
     Returns:
-        Response: A JSON response containing the metadata of the newly captured image.
+        Response: A JSON response containing the metadata of the newly captured image, or the queued job with a 202 status code.
     """
     patient_data: dict = request.get_json()
 
     try:
-        schema = PatientsSchema()
-        patient_data = schema.load( patient_data )
+        patient_data = TABLES[ 'patients' ].schema.load( patient_data )
     except ValidationError as e:
         abort( 400, e.messages )
 
-    image_data = ci.capture_image( payload=patient_data )
-
-    if image_data is None:
-        abort( 500, 'Failed to capture image' )
+    if request.args.get( 'async', '0' ).lower() in ( '1', 'true' ):
+        job = jobs.submit( 'capture_image', capture_image_entry, patient_data, callback_url=entry_callback_url() )
 
-    image_data.update( patient_data )
+        if job is None:
+            abort( 500, 'Failed to queue image capture' )
 
-    image_metadata = db.create_entry( data=image_data, table_name='images' )
-
-    if image_metadata is None:
-        abort( 500, 'Failed to insert new image entry' )
+        return jsonify( JOBS.schema.dump( job ) ), 202
 
-    schema = ImagesSchema()
+    try:
+        image_metadata = capture_image_entry( patient_data )
+    except RuntimeError as e:
+        abort( 500, str( e ) )
 
-    return jsonify( schema.dump( image_metadata ) )
+    return jsonify( image_metadata )
 
 @app.route( '/assessments', methods=['POST'] )
 def assess_image() -> Response:
@@ -221,7 +481,7 @@ def assess_image() -> Response:
         Response: A JSON response containing the assessment data.
     """
     ids: dict[ str, Any ] = request.get_json()
-    schema = AssessmentsSchema()
+    schema = TABLES[ 'assessments' ].schema
 
     try:
         ids = schema.load( ids )
@@ -233,7 +493,10 @@ def assess_image() -> Response:
     if assessment_data is None:
         abort( 500, 'Failed to analyze image' )
 
-    assessment_data.update( ids )
+    try:
+        assessment_data = TABLES[ 'assessments' ].import_schema.load( { **assessment_data, **ids }, unknown=EXCLUDE )
+    except ValidationError as e:
+        abort( 500, f'Invalid assessment data: { e.messages }' )
 
     assessment_data = db.create_entry( data=assessment_data, table_name='assessments' )
 
@@ -242,36 +505,179 @@ def assess_image() -> Response:
 
     return jsonify( schema.dump( assessment_data ) )
 
+@app.route( '/image_sets/<uuid:uid>/assess', methods=['POST'] )
+def assess_image_set( uid: UUID ) -> Response:
+    """Assess every image in an image set.
+
+    This function analyzes all images of the specified image set concurrently using the AnalyzerInterface,
+    and adds all successful assessments to the database in a single transaction.
+
+    Args:
+        uid ( UUID ): The UUID of the image set.
+
+    Returns:
+        Response: A JSON response containing the new assessments and the errors of the images that could not be assessed, keyed by image ID.
+    """
+    if db.get_entry_from_id( uuid=uid, table_name='image_sets' ) is None:
+        abort( 404, 'No image_sets with that UUID' )
+
+    images = db.get_images_from_set_id( set_id=uid )
+
+    if images is None:
+        abort( 500, 'Failed to fetch images of image set' )
+
+    payloads = [ { 'image_id': image[ 'id' ], 'set_id': image[ 'set_id' ], 'patient_id': image[ 'patient_id' ] } for image in images ]
+    results = ai.analyze_images( payloads )
+
+    load_schema = TABLES[ 'assessments' ].import_schema
+    assessments: list[ dict ] = []
+    errors: dict[ str, Any ] = {}
+    for ids, assessment_data in zip( payloads, results ):
+        if not isinstance( assessment_data, dict ):
+            errors[ ids[ 'image_id' ] ] = 'Failed to analyze image'
+            continue
+
+        try:
+            assessments.append( load_schema.load( { **assessment_data, **ids }, unknown=EXCLUDE ) )
+        except ValidationError as e:
+            errors[ ids[ 'image_id' ] ] = e.messages
+
+    created_assessments = db.create_entries( data=assessments, table_name='assessments', chunk_size=bulk_chunk_size ) if assessments else []
+
+    if created_assessments is None:
+        abort( 500, 'Failed to insert new assessment entries' )
+
+    return jsonify( { 'created': TABLES[ 'assessments' ].schema.dump( created_assessments, many=True ), 'errors': errors } )
+
+@app.route( '/<table_name>/bulk', methods=['POST'] )
+def add_table_entries( table_name: str ) -> Response:
+    """Add many entries to a table.
+
+    This function imports a JSON array of existing records into the specified table.
+    Each record is validated with the table's schema and checked for unknown foreign keys and duplicate unique values,
+    and all valid records are inserted in a single transaction. Invalid records are skipped and reported by their index in the array.
+
+    Args:
+        table_name ( str ): The name of the table.
+
+    Returns:
+        Response: A JSON response containing the metadata of the newly added entries and the validation errors of the skipped ones.
+    """
+    table = TABLES.get( table_name )
+
+    if table is None:
+        abort( 404, f"Table '{ table_name }' does not exist." )
+
+    records = request.get_json()
+
+    if not isinstance( records, list ):
+        abort( 400, 'Expected a JSON array of entries' )
+
+    # Positions of the loaded entries in the request, so that every error refers to the record the client sent
+    indices = list( range( len( records ) ) )
+    errors: dict[ int, Any ] = {}
+    entries: list[ dict ]
+    try:
+        entries = table.import_schema.load( records, many=True )
+    except ValidationError as e:
+        errors = cast( dict, e.messages )
+        indices = [ i for i in indices if i not in errors ]
+
+        if not indices:
+            abort( 400, errors )
+
+        entries = table.import_schema.load( [ records[ i ] for i in indices ], many=True )
+
+    conflicts = db.find_conflicting_entries( data=entries, table_name=table_name, chunk_size=bulk_chunk_size )
+
+    if conflicts is None:
+        abort( 500, f"Failed to check new { table_name } entries" )
+
+    if conflicts:
+        errors.update( { indices[ i ]: messages for i, messages in conflicts.items() } )
+        entries = [ entry for i, entry in enumerate( entries ) if i not in conflicts ]
+
+        if not entries:
+            abort( 400, errors )
+
+    created_entries = db.create_entries( data=entries, table_name=table_name, chunk_size=bulk_chunk_size )
+
+    if created_entries is None:
+        abort( 500, f"Failed to insert new { table_name } entries" )
+
+    return jsonify( { 'created': table.schema.dump( created_entries, many=True ), 'errors': errors } )
+
 @app.route( '/<table_name>', methods=['GET'] )
 def get_table_entries( table_name: str ) -> Response:
     """Get all entries from a table.
 
     This function retrieves all entries from the specified table.
     It uses the DBhandler class to interact with the database.
+    If a 'limit' or 'after' query parameter is given, a single page of entries is returned
+    together with the cursor to pass as 'after' to fetch the next page.
+    If 'format=ndjson' is given, the whole table is streamed as newline-delimited JSON instead.
+    Entries can be filtered by 'patient_id', 'set_id', 'image_id', 'assessment', and by
+    timestamp with 'since' ( inclusive ) and 'until' ( exclusive ), as supported by the table.
+    If 'fields' is given, only the listed columns are selected and returned.
 
     Args:
         table_name ( str ): The name of the table.
 
     Returns:
-        Response: A JSON response containing all entries from the table.
+        Response: A JSON response containing all entries from the table, or a page of entries and its 'next_cursor'.
     """
-    entries = db.get_all_entries( table_name=table_name )
+    if db.get_model_from_table_name( table_name=table_name ) is None:
+        abort( 404, f"Table '{ table_name }' does not exist." )
+
+    columns = entry_fields( table_name )
+
+    schema = TABLES[ table_name ].projected_schema( columns )
+
+    response_format = request.args.get( 'format', 'json' )
+    filters = entry_filters( table_name )
+
+    if response_format == 'ndjson':
+        chunks = db.stream_all_entries( table_name=table_name, chunk_size=stream_chunk_size, filters=filters, columns=columns )
+
+        if chunks is None:
+            abort( 500, f"Failed to fetch entries from '{ table_name }'" )
+
+        def generate_ndjson():
+            for chunk in chunks:
+                yield ''.join( f'{ app.json.dumps( entry ) }\n' for entry in schema.dump( chunk, many=True ) )
+
+        return Response( stream_with_context( generate_ndjson() ), mimetype='application/x-ndjson' )
+
+    if response_format != 'json':
+        abort( 400, f"Unsupported format '{ response_format }'" )
+
+    limit = request.args.get( 'limit', type=int )
+    after = request.args.get( 'after' )
+    paginate = limit is not None or after is not None
+
+    if 'limit' in request.args and ( limit is None or limit < 1 ):
+        abort( 400, "'limit' must be a positive integer" )
+
+    if after is not None:
+        try:
+            after = UUID( after )
+        except ValueError:
+            abort( 400, "'after' must be a UUID" )
+
+    if paginate:
+        page = db.get_entries_page( table_name=table_name, limit=min( limit or max_page_size, max_page_size ), after=after, filters=filters, columns=columns )
+        entries = page[ 'entries' ] if page is not None else None
+    else:
+        page = None
+        entries = db.get_all_entries( table_name=table_name, filters=filters, columns=columns )
 
     if entries is None:
-        abort( 404, f"Table '{ table_name }' does not exist." )
+        abort( 500, f"Failed to fetch entries from '{ table_name }'" )
 
-    schema = PatientsSchema( many=True )
-    match table_name:
-        case 'patients':
-            schema = PatientsSchema( many=True )
-        case 'image_sets':
-            schema = ImageSetsSchema( many=True )
-        case 'images':
-            schema = ImagesSchema( many=True )
-        case 'assessments':
-            schema = AssessmentsSchema( many=True )
+    if page is not None:
+        return jsonify( { 'entries': schema.dump( entries, many=True ), 'next_cursor': page[ 'next_cursor' ] } )
 
-    return jsonify( schema.dump( entries ) )
+    return jsonify( schema.dump( entries, many=True ) )
 
 @app.route( '/<table_name>/<uuid:uid>', methods=['GET'] )
 def get_table_entry_from_id( table_name: str, uid: UUID ) -> Response:
@@ -279,6 +685,8 @@ def get_table_entry_from_id( table_name: str, uid: UUID ) -> Response:
 
     This function retrieves a specific entry from the specified table based on its UUID.
     It uses the DBhandler class to interact with the database.
+    If 'fields' is given, only the listed columns are returned; the full entry is still read
+    so that it can be served from the entry cache.
 
     Args:
         table_name ( str ): The name of the table.
@@ -292,23 +700,67 @@ def get_table_entry_from_id( table_name: str, uid: UUID ) -> Response:
     if table_model is None:
         abort( 404, f"Table '{ table_name }' does not exist." )
 
+    columns = entry_fields( table_name )
+
     entry = db.get_entry_from_id( uuid=uid, table_name=table_name )
 
     if entry is None:
         abort( 404, f"'No { table_name } with that UUID" )
 
-    schema = PatientsSchema()
-    match table_name:
-        case 'patients':
-            schema = PatientsSchema()
-        case 'image_sets':
-            schema = ImageSetsSchema()
-        case 'images':
-            schema = ImagesSchema()
-        case 'assessments':
-            schema = AssessmentsSchema()
+    return jsonify( TABLES[ table_name ].projected_schema( columns ).dump( entry ) )
+
+@app.route( '/jobs/<uuid:uid>', methods=['GET'] )
+def get_job( uid: UUID ) -> Response:
+    """Get a background job by ID.
+
+    This function retrieves the status of a background job, and its result or error once it has finished.
+
+    Args:
+        uid ( UUID ): The UUID of the job.
+
+    Returns:
+        Response: A JSON response containing the job.
+    """
+    job = db.get_job( job_id=uid )
 
-    return jsonify( schema.dump( entry ) )
+    if job is None:
+        abort( 404, 'No jobs with that UUID' )
+
+    return jsonify( JOBS.schema.dump( job ) )
+
+@app.route( '/patients/<uuid:uid>/full', methods=['GET'] )
+def get_patient_record( uid: UUID ) -> Response:
+    """Get a patient's full record.
+
+    This function retrieves a patient along with all of their image sets, images and assessments.
+    It uses the DBhandler class to interact with the database.
+
+    Args:
+        uid ( UUID ): The UUID of the patient.
+
+    Returns:
+        Response: A JSON response containing the patient with its image sets, images and assessments nested.
+    """
+    record = db.get_all_data_from_patient_id( patient_id=uid )
+
+    if record is None:
+        abort( 404, 'No patients with that UUID' )
+
+    image_set_schema = TABLES[ 'image_sets' ].schema
+    image_schema = TABLES[ 'images' ].schema
+    assessment_schema = TABLES[ 'assessments' ].schema
+
+    # A single object is dumped to a dict, which the schemas' dump signature does not express
+    patient = cast( dict, TABLES[ 'patients' ].schema.dump( record ) )
+    patient[ 'image_sets' ] = [
+        {
+            **cast( dict, image_set_schema.dump( image_set ) ),
+            'images': [ { **cast( dict, image_schema.dump( image ) ), 'assessments': assessment_schema.dump( image[ 'assessments' ], many=True ) } for image in image_set[ 'images' ] ]
+        }
+        for image_set in record[ 'image_sets' ]
+    ]
+
+    return jsonify( patient )
 
 @app.errorhandler( 400 )
 def bad_request( error_context ):
@@ -355,16 +807,56 @@ def internal_server_error( error_context ):
     """
     return jsonify( { 'message': f'Database/Server Error: { error_context.description }' } ), 500
 
+def fail_unfinished_jobs():
+    """Fail the jobs left pending or running by a previous run, whose work died with it.
+
+    Call this once per server start, before any request is served, so that jobs of running workers are not affected.
+    """
+    failed = db.fail_unfinished_jobs( 'Interrupted by a server restart' )
+
+    if failed:
+        print( f'Marked { failed } unfinished jobs as failed' )
+
+def init_worker():
+    """Prepare a worker process forked from a process that imported the app.
+
+    The database pool, HTTP sessions and thread pools are created at import and cannot be shared across a fork,
+    so the inherited connections are dropped without closing them and every worker creates its own.
+    """
+    db.dispose( close=False )
+    ci.reset()
+    ai.reset()
+    cb.reset()
+    jobs.reset()
+
+def shutdown_app():
+    """Drain in-flight work and release all connections.
+
+    Background jobs, such as asynchronous captures, finish first since they still use the camera, the analyzer and the database.
+    Then the upstream executors finish their in-flight calls before the sessions and the database pool are closed.
+    """
+    jobs.shutdown( wait=True )
+    ci.shutdown()
+    ai.shutdown()
+    cb.shutdown()
+    db.dispose()
+
 def start_app():
-    """Start the Flask app.
+    """Start the Flask development server.
 
     This function loads the .env file, if present, and starts the Flask app.
     It sets the debug mode, host address, and port based on environment variables.
+    In production, run the app with Gunicorn and gunicorn.conf.py instead.
     """
     print( 'Loading .env file if present...' )
     load_dotenv()
     print( 'Starting API...' )
-    app.run( debug=debug_mode, host=host_address, port=bind_port )
+    fail_unfinished_jobs()
+
+    try:
+        app.run( debug=debug_mode, host=host_address, port=bind_port )
+    finally:
+        shutdown_app()
 
 if __name__ == '__main__':
     start_app()
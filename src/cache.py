@@ -0,0 +1,83 @@
+from collections import OrderedDict
+from threading import Lock
+from time import monotonic
+from typing import Optional, Dict, Any, Hashable
+
+class LRUCache:
+    """Thread-safe in-process cache with LRU eviction and a per-entry time to live."""
+
+    def __init__( self, max_size: int = 1024, ttl: float = 30.0 ):
+        """Initializes the cache.
+
+        Args:
+            max_size ( int, optional ): The maximum number of entries kept, or 0 to disable caching. Defaults to 1024.
+            ttl ( float, optional ): The number of seconds an entry stays valid. Defaults to 30.0.
+        """
+        self.__max_size = max_size
+        self.__ttl = ttl
+        self.__entries: OrderedDict[ Hashable, tuple[ float, Any ] ] = OrderedDict()
+        self.__lock = Lock()
+        self.__hits = 0
+        self.__misses = 0
+
+    def get( self, key: Hashable ) -> Optional[Any]:
+        """Retrieves a value from the cache and marks it as most recently used.
+
+        Args:
+            key ( Hashable ): The cache key.
+
+        Returns:
+            Optional[Any]: The cached value, or None if the key is missing or expired.
+        """
+        with self.__lock:
+            entry = self.__entries.get( key )
+
+            if entry is None or entry[0] < monotonic():
+                if entry is not None:
+                    del self.__entries[ key ]
+                self.__misses += 1
+                return None
+
+            self.__entries.move_to_end( key )
+            self.__hits += 1
+            return entry[1]
+
+    def set( self, key: Hashable, value: Any ):
+        """Stores a value in the cache, evicting the least recently used entry if the cache is full.
+
+        Args:
+            key ( Hashable ): The cache key.
+            value ( Any ): The value to store.
+        """
+        if self.__max_size <= 0:
+            return
+
+        with self.__lock:
+            self.__entries[ key ] = ( monotonic() + self.__ttl, value )
+            self.__entries.move_to_end( key )
+
+            while len( self.__entries ) > self.__max_size:
+                self.__entries.popitem( last=False )
+
+    def invalidate( self, key: Hashable ):
+        """Removes a value from the cache if present.
+
+        Args:
+            key ( Hashable ): The cache key.
+        """
+        with self.__lock:
+            self.__entries.pop( key, None )
+
+    def clear( self ):
+        """Removes all values from the cache."""
+        with self.__lock:
+            self.__entries.clear()
+
+    def stats( self ) -> Dict[str, Any]:
+        """Retrieves the cache counters.
+
+        Returns:
+            Dict[str, Any]: A dictionary with the number of hits, misses and stored entries, and the configured size and TTL.
+        """
+        with self.__lock:
+            return { 'hits': self.__hits, 'misses': self.__misses, 'size': len( self.__entries ), 'max_size': self.__max_size, 'ttl': self.__ttl }
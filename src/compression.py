@@ -0,0 +1,117 @@
+import zlib
+from typing import Optional, Iterable, Iterator
+from flask import Flask, Response, request
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+COMPRESSIBLE_MIMETYPES = ( 'application/json', 'application/x-ndjson', 'text/html', 'text/plain', 'text/csv' )
+
+class Compressor:
+    """Compresses responses with gzip or brotli, as negotiated with the Accept-Encoding header.
+
+    Buffered responses are only compressed from a minimum size, while streamed responses are always
+    compressed chunk by chunk and flushed after every chunk so clients keep receiving data as it is produced.
+    Brotli is only offered when the brotli package is installed.
+    """
+
+    def __init__( self, app: Flask, min_size: int = 1024, gzip_level: int = 6, brotli_quality: int = 4 ):
+        """Initializes the compressor and registers it on an application.
+
+        Args:
+            app ( Flask ): The application whose responses are compressed.
+            min_size ( int, optional ): The minimum size in bytes of a buffered response to compress. Defaults to 1024.
+            gzip_level ( int, optional ): The gzip compression level, from 1 to 9. Defaults to 6.
+            brotli_quality ( int, optional ): The brotli compression quality, from 0 to 11. Defaults to 4.
+        """
+        self.__min_size = min_size
+        self.__gzip_level = gzip_level
+        self.__brotli_quality = brotli_quality
+        self.__encodings = [ 'br', 'gzip' ] if brotli is not None else [ 'gzip' ]
+        app.after_request( self.__compress )
+
+    def __choose_encoding( self ) -> Optional[str]:
+        """Selects the preferred encoding accepted by the client.
+
+        Returns:
+            Optional[str]: The content encoding, or None if the client accepts none of the supported encodings.
+        """
+        encoding = request.accept_encodings.best_match( self.__encodings )
+        return encoding if encoding and request.accept_encodings.quality( encoding ) > 0 else None
+
+    def __compress( self, response: Response ) -> Response:
+        """Compresses a response if it is compressible and the client accepts a supported encoding.
+
+        Args:
+            response ( Response ): The response to compress.
+
+        Returns:
+            Response: The response, compressed if applicable.
+        """
+        if (
+            response.mimetype not in COMPRESSIBLE_MIMETYPES
+            or response.status_code < 200
+            or response.status_code in ( 204, 304 )
+            or response.direct_passthrough
+            or 'Content-Encoding' in response.headers
+        ):
+            return response
+
+        response.vary.add( 'Accept-Encoding' )
+        encoding = self.__choose_encoding()
+
+        if encoding is None:
+            return response
+
+        if response.is_streamed:
+            response.response = self.__compress_stream( response.response, encoding )
+            response.headers.pop( 'Content-Length', None )
+        else:
+            data = response.get_data()
+
+            if len( data ) < self.__min_size:
+                return response
+
+            if encoding == 'br':
+                assert brotli is not None
+                response.set_data( brotli.compress( data, quality=self.__brotli_quality ) )
+            else:
+                compressor = zlib.compressobj( self.__gzip_level, zlib.DEFLATED, 31 )
+                response.set_data( compressor.compress( data ) + compressor.flush() )
+
+        response.headers[ 'Content-Encoding' ] = encoding
+        return response
+
+    def __compress_stream( self, chunks: Iterable[str | bytes], encoding: str ) -> Iterator[bytes]:
+        """Compresses a streamed response body chunk by chunk.
+
+        Args:
+            chunks ( Iterable[str | bytes] ): The chunks of the response body.
+            encoding ( str ): The content encoding.
+
+        Yields:
+            bytes: The compressed chunks.
+        """
+        if encoding == 'br':
+            assert brotli is not None
+            compressor = brotli.Compressor( quality=self.__brotli_quality )
+            compress, flush, finish = compressor.process, compressor.flush, compressor.finish
+        else:
+            compressor = zlib.compressobj( self.__gzip_level, zlib.DEFLATED, 31 )
+            compress, flush, finish = compressor.compress, lambda: compressor.flush( zlib.Z_SYNC_FLUSH ), compressor.flush
+
+        try:
+            for chunk in chunks:
+                if isinstance( chunk, str ):
+                    chunk = chunk.encode()
+                if chunk:
+                    yield compress( chunk ) + flush()
+
+            yield finish()
+
+        finally:
+            close = getattr( chunks, 'close', None )
+            if close is not None:
+                close()
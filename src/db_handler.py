@@ -1,21 +1,133 @@
 import sqlalchemy as sa
-from sqlalchemy.orm import Session
 import secrets
+import json
+from time import perf_counter
+from datetime import datetime, timezone
 from uuid import UUID
-from typing import Optional, List, Dict, Any
-from models import PatientsModel, ImageSetsModel, ImagesModel, AssessmentsModel
+from typing import Optional, List, Dict, Any, Iterator
+from models import PatientsModel, ImageSetsModel, ImagesModel, AssessmentsModel, JobsModel
+from cache import LRUCache
+from registry import TABLES
+from metrics import TimedQueuePool, instrument_engine
+from migrations import run_migrations
+
+SQLITE_PRAGMAS: Dict[str, Any] = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'busy_timeout': 5000,
+    'cache_size': -64000,
+    'mmap_size': 268435456,
+    'foreign_keys': 'ON'
+}
+
+#* NOTE: Only these columns can be filtered on, so filter names from requests never reach the SQL as identifiers.
+FILTER_COLUMNS = ( 'patient_id', 'set_id', 'image_id', 'assessment' )
+TIMESTAMP_COLUMNS: Dict[str, str] = {
+    'images': 'image_timestamp',
+    'assessments': 'assessment_timestamp'
+}
 
 class DBhandler:
     """Handles database interactions for various models."""
 
-    def __init__( self, db_uri: str, debug: bool ):
+    def __init__( self, db_uri: str, debug: bool, pool_size: int = 5, max_overflow: int = 10, pool_pre_ping: bool = False, pool_recycle: int = -1, sqlite_pragmas: Optional[Dict[str, Any]] = None, cache_size: int = 1024, cache_ttl: float = 30.0, slow_query_threshold: Optional[float] = None ):
         """Initializes the database handler.
 
         Args:
             db_uri ( str ): The database connection URI.
             debug ( bool ): Whether to enable debug mode for the database engine.
+            pool_size ( int, optional ): The number of connections kept open in the pool. Defaults to 5.
+            max_overflow ( int, optional ): The number of connections allowed beyond pool_size. Defaults to 10.
+            pool_pre_ping ( bool, optional ): Whether to test connections for liveness on checkout. Defaults to False.
+            pool_recycle ( int, optional ): The number of seconds after which a connection is replaced, or -1 to never recycle. Defaults to -1.
+            sqlite_pragmas ( Optional[Dict[str, Any]], optional ): PRAGMA values applied to every new SQLite connection, overriding SQLITE_PRAGMAS. Defaults to None.
+            cache_size ( int, optional ): The maximum number of entries kept in the entry cache, or 0 to disable it. Defaults to 1024.
+            cache_ttl ( float, optional ): The number of seconds an entry stays in the entry cache. Defaults to 30.0.
+            slow_query_threshold ( Optional[float], optional ): The number of seconds above which statements are logged with their parameters, or None to disable the slow-query log. Defaults to None.
         """
-        self.__engine: sa.Engine = sa.create_engine( db_uri, echo=debug )
+        self.__cache = LRUCache( max_size=cache_size, ttl=cache_ttl )
+        url = sa.make_url( db_uri )
+        engine_options: Dict[str, Any] = { 'echo': debug, 'pool_pre_ping': pool_pre_ping, 'pool_recycle': pool_recycle }
+
+        # In-memory SQLite databases use a per-thread pool that cannot be sized
+        if url.get_backend_name() != 'sqlite' or url.database not in ( None, '', ':memory:' ):
+            engine_options.update( poolclass=TimedQueuePool, pool_size=pool_size, max_overflow=max_overflow )
+
+        self.__engine: sa.Engine = sa.create_engine( url, **engine_options )
+        instrument_engine( self.__engine )
+
+        if slow_query_threshold is not None:
+            self.__log_slow_queries( self.__engine, slow_query_threshold )
+
+        if self.__engine.dialect.name == 'sqlite':
+            pragmas = { **SQLITE_PRAGMAS, **( sqlite_pragmas or {} ) }
+            sa.event.listen( self.__engine, 'connect', lambda dbapi_conn, _: self.__apply_pragmas( dbapi_conn, pragmas ) )
+
+        try:
+            run_migrations( self.__engine )
+        except Exception as e:
+            print( f'Error occurred while migrating database: { e }' )
+
+    @staticmethod
+    def __apply_pragmas( dbapi_conn: Any, pragmas: Dict[str, Any] ):
+        """Applies PRAGMA values to a new SQLite connection.
+
+        WAL journaling lets readers run concurrently with a writer, and the busy timeout makes
+        writers wait for the lock instead of failing with 'database is locked'.
+
+        Args:
+            dbapi_conn ( Any ): The raw DBAPI connection.
+            pragmas ( Dict[str, Any] ): The PRAGMA names and values to apply.
+        """
+        cursor = dbapi_conn.cursor()
+        for name, value in pragmas.items():
+            cursor.execute( f'PRAGMA { name }={ value }' )
+        cursor.close()
+
+    @staticmethod
+    def __log_slow_queries( engine: sa.Engine, threshold: float ):
+        """Logs the SQL, parameters and duration of every statement slower than a threshold.
+
+        Args:
+            engine ( sa.Engine ): The engine whose statements are timed.
+            threshold ( float ): The number of seconds above which a statement is logged.
+        """
+        @sa.event.listens_for( engine, 'before_cursor_execute' )
+        def start_timer( conn, cursor, statement, parameters, context, executemany ):
+            conn.info.setdefault( 'slow_query_start', [] ).append( perf_counter() )
+
+        @sa.event.listens_for( engine, 'after_cursor_execute' )
+        def log_slow_query( conn, cursor, statement, parameters, context, executemany ):
+            elapsed = perf_counter() - conn.info[ 'slow_query_start' ].pop()
+
+            if elapsed >= threshold:
+                params = repr( parameters )
+                if len( params ) > 1000:
+                    params = f'{ params[ :1000 ] }... ( { len( parameters ) } parameter sets )' if executemany else f'{ params[ :1000 ] }...'
+                print( f'Slow query ( { elapsed * 1000:.1f} ms ):\n{ statement }\nParameters: { params }' )
+
+        @sa.event.listens_for( engine, 'handle_error' )
+        def discard_timer( exception_context ):
+            conn = exception_context.connection
+            if conn is not None and conn.info.get( 'slow_query_start' ):
+                conn.info[ 'slow_query_start' ].pop()
+
+    def get_cache_stats( self ) -> Dict[str, Any]:
+        """Retrieves the hit and miss counters of the entry cache.
+
+        Returns:
+            Dict[str, Any]: A dictionary with the cache counters and configuration.
+        """
+        return self.__cache.stats()
+
+    def dispose( self, close: bool = True ):
+        """Discards the pooled connections. New connections are opened on the next checkout.
+
+        Args:
+            close ( bool, optional ): Whether to close the connections. Pass False in a forked child process, whose pool
+                still holds the parent's connections, so they are dropped without disturbing the parent. Defaults to True.
+        """
+        self.__engine.dispose( close=close )
 
     def get_model_from_table_name( self, table_name: str ) -> Optional[Any]:
         """Retrieves the SQLAlchemy model associated with a given table name.
@@ -26,18 +138,91 @@ class DBhandler:
         Returns:
             Optional[Any]: The SQLAlchemy model if found, None otherwise.
         """
-        return {
-            'patients': PatientsModel,
-            'image_sets': ImageSetsModel,
-            'images': ImagesModel,
-            'assessments': AssessmentsModel
-        }.get( table_name )
+        table = TABLES.get( table_name )
+        return table.model if table is not None else None
+
+    def get_filter_names( self, table_name: str ) -> Optional[List[str]]:
+        """Retrieves the names of the filters supported by a given table.
+
+        These are the filterable columns of its model, plus 'since' and 'until' if it has a timestamp column.
+
+        Args:
+            table_name ( str ): The name of the table.
 
-    def get_all_entries( self, table_name: str ) -> Optional[List[Dict[str, Any]]]:
+        Returns:
+            Optional[List[str]]: A list of filter names, or None if the table does not exist.
+        """
+
+        model = self.get_model_from_table_name( table_name )
+
+        if model is None:
+            return None
+
+        names = [ name for name in FILTER_COLUMNS if name in model.__table__.c ]
+        if table_name in TIMESTAMP_COLUMNS:
+            names += [ 'since', 'until' ]
+
+        return names
+
+    def __filter_query( self, query: sa.Select, model: Any, filters: Optional[Dict[str, Any]] ) -> sa.Select:
+        """Adds filters to the WHERE clause of a query.
+
+        Columns are compared for equality, while 'since' and 'until' select the half-open range [ since, until ) of the timestamp column.
+
+        Args:
+            query ( sa.Select ): The query to filter.
+            model ( Any ): The SQLAlchemy model queried.
+            filters ( Optional[Dict[str, Any]] ): The filter names and values.
+
+        Raises:
+            ValueError: If a filter is not supported by the model.
+
+        Returns:
+            sa.Select: The filtered query.
+        """
+        if filters and not set( filters ) <= set( self.get_filter_names( model.__tablename__ ) or [] ):
+            raise ValueError( f'Unsupported filters for { model.__tablename__ }: { sorted( filters ) }' )
+
+        for name, value in ( filters or {} ).items():
+            if name == 'since':
+                query = query.where( model.__table__.c[ TIMESTAMP_COLUMNS[ model.__tablename__ ] ] >= value )
+            elif name == 'until':
+                query = query.where( model.__table__.c[ TIMESTAMP_COLUMNS[ model.__tablename__ ] ] < value )
+            else:
+                query = query.where( model.__table__.c[ name ] == value )
+
+        return query
+
+    @staticmethod
+    def __select_columns( model: Any, columns: Optional[List[str]] ) -> sa.Select:
+        """Builds a query selecting either all columns of a model or only the given ones.
+
+        Args:
+            model ( Any ): The SQLAlchemy model queried.
+            columns ( Optional[List[str]] ): The names of the columns to select, or None for all columns.
+
+        Raises:
+            ValueError: If a column does not exist on the model.
+
+        Returns:
+            sa.Select: The query.
+        """
+        if not columns:
+            return sa.select( model )
+
+        unknown = [ name for name in columns if name not in model.__table__.c ]
+        if unknown:
+            raise ValueError( f'Unknown columns for { model.__tablename__ }: { unknown }' )
+
+        return sa.select( *[ model.__table__.c[ name ] for name in columns ] )
+
+    def get_all_entries( self, table_name: str, filters: Optional[Dict[str, Any]] = None, columns: Optional[List[str]] = None ) -> Optional[List[Dict[str, Any]]]:
         """Retrieves all entries from a given table.
 
         Args:
             table_name ( str ): The name of the table.
+            filters ( Optional[Dict[str, Any]], optional ): The filters applied in the WHERE clause. Defaults to None.
+            columns ( Optional[List[str]], optional ): The names of the columns to select, or None for all columns. Defaults to None.
 
         Returns:
             Optional[List[Dict[str, Any]]]: A list of dictionaries representing the entries, or None if an error occurs.
@@ -48,9 +233,9 @@ class DBhandler:
         if model is None:
             return None
 
-        query = sa.select( model )
-
         try:
+            query = self.__filter_query( self.__select_columns( model, columns ), model, filters ).order_by( model.id )
+
             with self.__engine.begin() as conn:
                 result = conn.execute( query ).fetchall()
                 result = [ r._asdict() for r in result ]
@@ -61,6 +246,104 @@ class DBhandler:
 
         return result
 
+    def stream_all_entries( self, table_name: str, chunk_size: int = 1000, filters: Optional[Dict[str, Any]] = None, columns: Optional[List[str]] = None ) -> Optional[Iterator[List[Dict[str, Any]]]]:
+        """Streams all entries from a given table in chunks using a server-side cursor.
+
+        Only one chunk of rows is held in memory at a time, so memory use does not grow with the table size.
+
+        Args:
+            table_name ( str ): The name of the table.
+            chunk_size ( int, optional ): The number of rows fetched per chunk. Defaults to 1000.
+            filters ( Optional[Dict[str, Any]], optional ): The filters applied in the WHERE clause. Defaults to None.
+            columns ( Optional[List[str]], optional ): The names of the columns to select, or None for all columns. Defaults to None.
+
+        Returns:
+            Optional[Iterator[List[Dict[str, Any]]]]: An iterator over lists of dictionaries representing the entries, or None if the table does not exist or a filter or column is not supported.
+        """
+
+        model = self.get_model_from_table_name( table_name )
+
+        if model is None:
+            return None
+
+        try:
+            query = self.__filter_query( self.__select_columns( model, columns ), model, filters ).order_by( model.id )
+        except ValueError as e:
+            print( f'Error occurred while streaming entries: { e }' )
+            return None
+
+        return self.__stream_query( query, chunk_size )
+
+    def __stream_query( self, query: sa.Select, chunk_size: int ) -> Iterator[List[Dict[str, Any]]]:
+        """Executes a query with a server-side cursor and yields its rows in chunks.
+
+        Args:
+            query ( sa.Select ): The query to execute.
+            chunk_size ( int ): The number of rows fetched per chunk.
+
+        Yields:
+            List[Dict[str, Any]]: A list of dictionaries representing a chunk of rows.
+
+        Raises:
+            Exception: Any error raised while fetching rows. It is re-raised rather than ending the stream early,
+                so that a streamed response is cut off instead of completing without the remaining rows.
+        """
+        try:
+            with self.__engine.connect() as conn:
+                result = conn.execution_options( yield_per=chunk_size ).execute( query )
+                for partition in result.partitions():
+                    yield [ r._asdict() for r in partition ]
+
+        except Exception as e:
+            print( f'Error occurred while streaming entries: { e }' )
+            raise
+
+    def get_entries_page( self, table_name: str, limit: int, after: Optional[UUID] = None, filters: Optional[Dict[str, Any]] = None, columns: Optional[List[str]] = None ) -> Optional[Dict[str, Any]]:
+        """Retrieves a single page of entries from a given table using keyset pagination.
+
+        Entries are ordered by their primary key, so a page is fetched with an indexed range scan
+        instead of an OFFSET, and the cost of a request depends on the page size rather than the table size.
+
+        Args:
+            table_name ( str ): The name of the table.
+            limit ( int ): The maximum number of entries to return.
+            after ( Optional[UUID], optional ): The cursor returned by the previous page. Defaults to None.
+            filters ( Optional[Dict[str, Any]], optional ): The filters applied in the WHERE clause. Defaults to None.
+            columns ( Optional[List[str]], optional ): The names of the columns to select, or None for all columns. The 'id' column is always selected for the cursor. Defaults to None.
+
+        Returns:
+            Optional[Dict[str, Any]]: A dictionary with the page 'entries' and the 'next_cursor' ( None on the last page ), or None if an error occurs.
+        """
+
+        model = self.get_model_from_table_name( table_name )
+
+        if model is None:
+            return None
+
+        try:
+            if columns and 'id' not in columns:
+                columns = [ 'id', *columns ]
+
+            query = self.__filter_query( self.__select_columns( model, columns ), model, filters ).order_by( model.id ).limit( limit + 1 )
+
+            if after is not None:
+                query = query.where( model.id > after )
+
+            with self.__engine.begin() as conn:
+                result = conn.execute( query ).fetchall()
+                result = [ r._asdict() for r in result ]
+
+        except Exception as e:
+            print( f'Error occurred while fetching page of entries: { e }' )
+            return None
+
+        next_cursor = None
+        if len( result ) > limit:
+            result = result[ :limit ]
+            next_cursor = result[ -1 ][ 'id' ]
+
+        return { 'entries': result, 'next_cursor': next_cursor }
+
     def get_top_entry( self, table_name: str, order='id' ) -> Optional[ Dict[ str, Any ] ]:
         """Retrieves the top entry from a given table, ordered by a specified column.
 
@@ -93,6 +376,8 @@ class DBhandler:
     def get_entry_from_id( self, uuid: UUID, table_name: str ) -> Optional[Dict[str, Any]]:
         """Retrieves an entry from a given table based on its UUID.
 
+        Entries are served from the entry cache while they are fresh.
+
         Args:
             uuid ( UUID ): The UUID of the entry.
             table_name ( str ): The name of the table.
@@ -106,6 +391,12 @@ class DBhandler:
         if model is None:
             return None
 
+        cache_key = ( table_name, str( uuid ) )
+        cached = self.__cache.get( cache_key )
+
+        if cached is not None:
+            return dict( cached )
+
         query = sa.select( model ).where( model.id == str( uuid ) )
 
         try:
@@ -117,12 +408,40 @@ class DBhandler:
             print( f'Error occurred while fetching entry by ID: { e }' )
             return None
 
+        if result is not None:
+            self.__cache.set( cache_key, dict( result ) )
+
         print( result )
         return result
 
+    def get_images_from_set_id( self, set_id: UUID ) -> Optional[List[Dict[str, Any]]]:
+        """Retrieves all images belonging to an image set.
+
+        Args:
+            set_id ( UUID ): The UUID of the image set.
+
+        Returns:
+            Optional[List[Dict[str, Any]]]: A list of dictionaries representing the images, or None if an error occurs.
+        """
+        query = self.__filter_query( sa.select( ImagesModel ), ImagesModel, { 'set_id': set_id } ).order_by( ImagesModel.image_timestamp )
+
+        try:
+            with self.__engine.begin() as conn:
+                result = conn.execute( query ).fetchall()
+                result = [ r._asdict() for r in result ]
+
+        except Exception as e:
+            print( f'Error occurred while fetching images of set: { e }' )
+            return None
+
+        return result
+
     def create_entry( self, data: dict, table_name: str ) -> Optional[Dict[str, Any]]:
         """Creates a new entry in a given table.
 
+        The created row is returned by the INSERT itself ( INSERT ... RETURNING ) so no read-back query is needed.
+        On backends without RETURNING support the inserted values are returned instead.
+
         Args:
             data ( dict ): A dictionary containing the data for the new entry.
             table_name ( str ): The name of the table.
@@ -136,35 +455,275 @@ class DBhandler:
         if model is None:
             return None
 
-        new_entry = model( **data )
-        uid = UUID( hex=secrets.token_hex( 16 ) )
-
-        new_entry.id = str( uid )
+        row = { **data, 'id': str( UUID( hex=secrets.token_hex( 16 ) ) ) }
+        query = sa.insert( model ).values( **row )
 
         try:
-            with Session( self.__engine ) as conn:
-                conn.add( new_entry )
-                conn.commit()
-                result = conn.execute( sa.select( model ).where( model.id == str( uid ) ) ).fetchone()
-                result = result._asdict() if result else None
+            with self.__engine.begin() as conn:
+                if self.__engine.dialect.insert_returning:
+                    result = conn.execute( query.returning( *model.__table__.columns ) ).fetchone()
+                    result = result._asdict() if result else None
+                else:
+                    conn.execute( query )
+                    result = row
 
         except Exception as e:
             print( f'Error occurred while creating entry: {e}' )
             return None
 
+        self.__cache.invalidate( ( table_name, row[ 'id' ] ) )
+
         print( result )
         return result
 
-    # TODO: Implement function to get all data linked to a specific patient ID
-    def get_all_data_from_patient_id( self, patient_id: UUID, table_name: str ) -> Optional[Dict[str, Any]]:
-        """Retrieves all entries from a given table linked to a specific patient ID.
+    def create_entries( self, data: List[Dict[str, Any]], table_name: str, chunk_size: int = 500 ) -> Optional[List[Dict[str, Any]]]:
+        """Creates many new entries in a given table in a single transaction.
+
+        IDs are generated up front and the rows are inserted with one executemany per chunk.
 
         Args:
-            patient_id ( UUID ): The UUID of the patient.
+            data ( List[Dict[str, Any]] ): A list of dictionaries containing the data for the new entries.
             table_name ( str ): The name of the table.
+            chunk_size ( int, optional ): The number of rows inserted per statement. Defaults to 500.
+
+        Returns:
+            Optional[List[Dict[str, Any]]]: A list of dictionaries representing the created entries, or None if an error occurs.
+        """
+
+        model = self.get_model_from_table_name( table_name )
+
+        if model is None:
+            return None
+
+        rows = [ { **d, 'id': str( UUID( bytes=secrets.token_bytes( 16 ) ) ) } for d in data ]
+
+        try:
+            with self.__engine.begin() as conn:
+                for i in range( 0, len( rows ), chunk_size ):
+                    conn.execute( sa.insert( model ), rows[ i:i + chunk_size ] )
+
+        except Exception as e:
+            print( f'Error occurred while creating entries: { e }' )
+            return None
+
+        for row in rows:
+            self.__cache.invalidate( ( table_name, row[ 'id' ] ) )
+
+        return rows
+
+    def find_conflicting_entries( self, data: List[Dict[str, Any]], table_name: str, chunk_size: int = 500 ) -> Optional[Dict[int, Dict[str, List[str]]]]:
+        """Finds the new entries that would violate a foreign key or unique constraint of a given table.
+
+        Each foreign key and unique column is checked with one query per chunk, so the entries that would fail
+        can be reported and skipped instead of failing the whole insert. A value repeated within the data conflicts
+        with its first occurrence.
+
+        Args:
+            data ( List[Dict[str, Any]] ): A list of dictionaries containing the data for the new entries.
+            table_name ( str ): The name of the table.
+            chunk_size ( int, optional ): The number of entries checked per query. Defaults to 500.
+
+        Returns:
+            Optional[Dict[int, Dict[str, List[str]]]]: The error messages of each conflicting entry by column, keyed by its index in data, or None if an error occurs.
+        """
+
+        model = self.get_model_from_table_name( table_name )
+
+        if model is None:
+            return None
+
+        table = model.__table__
+        foreign_keys = [ ( fk.parent.name, fk.column ) for fk in table.foreign_keys ]
+        unique_columns = [ c for c in table.columns if c.unique and not c.primary_key ]
+        seen: Dict[str, set] = { c.name: set() for c in unique_columns }
+        errors: Dict[int, Dict[str, List[str]]] = {}
+
+        try:
+            with self.__engine.connect() as conn:
+                for start in range( 0, len( data ), chunk_size ):
+                    chunk = list( enumerate( data[ start:start + chunk_size ], start ) )
+
+                    for column_name, referred in foreign_keys:
+                        values = { row[ column_name ] for _, row in chunk if row.get( column_name ) is not None }
+                        existing = { str( v ) for v in conn.execute( sa.select( referred ).where( referred.in_( values ) ) ).scalars() } if values else set()
+
+                        for i, row in chunk:
+                            value = row.get( column_name )
+                            if value is not None and str( value ) not in existing:
+                                errors.setdefault( i, {} )[ column_name ] = [ f"No entry with { referred.name } '{ value }' exists in { referred.table.name }" ]
+
+                    for column in unique_columns:
+                        values = { row[ column.name ] for _, row in chunk if row.get( column.name ) is not None }
+                        existing = { str( v ) for v in conn.execute( sa.select( column ).where( column.in_( values ) ) ).scalars() } if values else set()
+
+                        for i, row in chunk:
+                            value = row.get( column.name )
+                            if value is None or i in errors:
+                                continue
+                            if str( value ) in existing or str( value ) in seen[ column.name ]:
+                                errors[ i ] = { column.name: [ f"An entry with { column.name } '{ value }' already exists in { table_name }" ] }
+                            else:
+                                seen[ column.name ].add( str( value ) )
+
+        except Exception as e:
+            print( f'Error occurred while checking entries: { e }' )
+            return None
+
+        return errors
+
+    def get_all_data_from_patient_id( self, patient_id: UUID ) -> Optional[Dict[str, Any]]:
+        """Retrieves a patient together with all of their image sets, images and assessments.
+
+        Every child table carries the patient ID, so the whole record is fetched with one query per table
+        regardless of how much data the patient has, and nested in memory.
+
+        Args:
+            patient_id ( UUID ): The UUID of the patient.
+
+        Returns:
+            Optional[Dict[str, Any]]: A dictionary representing the patient, with its 'image_sets', each with its 'images',
+            each with its 'assessments', or None if an error occurs or no patient is found.
+        """
+
+        pid = str( patient_id )
+
+        try:
+            with self.__engine.begin() as conn:
+                patient = conn.execute( sa.select( PatientsModel ).where( PatientsModel.id == pid ) ).fetchone()
+
+                if patient is None:
+                    return None
+
+                image_sets = conn.execute( sa.select( ImageSetsModel ).where( ImageSetsModel.patient_id == pid ).order_by( ImageSetsModel.id ) ).fetchall()
+                images = conn.execute( sa.select( ImagesModel ).where( ImagesModel.patient_id == pid ).order_by( ImagesModel.image_timestamp ) ).fetchall()
+                assessments = conn.execute( sa.select( AssessmentsModel ).where( AssessmentsModel.patient_id == pid ).order_by( AssessmentsModel.assessment_timestamp ) ).fetchall()
+
+        except Exception as e:
+            print( f'Error occurred while fetching all data for patient: { e }' )
+            return None
+
+        assessments_by_image: Dict[str, List[Dict[str, Any]]] = {}
+        for a in assessments:
+            assessments_by_image.setdefault( a.image_id, [] ).append( a._asdict() )
+
+        images_by_set: Dict[str, List[Dict[str, Any]]] = {}
+        for i in images:
+            images_by_set.setdefault( i.set_id, [] ).append( { **i._asdict(), 'assessments': assessments_by_image.get( i.id, [] ) } )
+
+        result = patient._asdict()
+        result[ 'image_sets' ] = [ { **s._asdict(), 'images': images_by_set.get( s.id, [] ) } for s in image_sets ]
+
+        return result
+
+    def create_job( self, kind: str, callback_url: Optional[str] = None ) -> Optional[Dict[str, Any]]:
+        """Creates a new pending background job.
+
+        Args:
+            kind ( str ): The kind of work the job performs.
+            callback_url ( Optional[str], optional ): The URL notified when the job finishes. Defaults to None.
+
+        Returns:
+            Optional[Dict[str, Any]]: A dictionary representing the created job, or None if an error occurs.
+        """
+        # Stored naive in UTC, like every other timestamp, since SQLite drops the offset and reads would differ from this row
+        now = datetime.now( timezone.utc ).replace( tzinfo=None )
+        row = {
+            'id': str( UUID( hex=secrets.token_hex( 16 ) ) ),
+            'kind': kind,
+            'status': 'pending',
+            'result': None,
+            'error': None,
+            'callback_url': callback_url,
+            'created_at': now,
+            'updated_at': now
+        }
+
+        try:
+            with self.__engine.begin() as conn:
+                conn.execute( sa.insert( JobsModel ).values( **row ) )
+
+        except Exception as e:
+            print( f'Error occurred while creating job: { e }' )
+            return None
+
+        return row
+
+    def update_job( self, job_id: str, status: str, result: Optional[Dict[str, Any]] = None, error: Optional[str] = None ) -> bool:
+        """Updates the status of a background job.
+
+        Args:
+            job_id ( str ): The ID of the job.
+            status ( str ): The new status of the job.
+            result ( Optional[Dict[str, Any]], optional ): The result of the job, stored as JSON. Defaults to None.
+            error ( Optional[str], optional ): The error message of a failed job. Defaults to None.
 
         Returns:
-            Optional[List[Dict[str, Any]]]: A list of dictionaries representing the linked entries, or None if an error occurs.
+            bool: True if the job was updated, False otherwise.
         """
-        pass
+        query = sa.update( JobsModel ).where( JobsModel.id == job_id ).values(
+            status=status,
+            result=json.dumps( result ) if result is not None else None,
+            error=error,
+            updated_at=datetime.now( timezone.utc ).replace( tzinfo=None )
+        )
 
+        try:
+            with self.__engine.begin() as conn:
+                updated = conn.execute( query ).rowcount
+
+        except Exception as e:
+            print( f'Error occurred while updating job: { e }' )
+            return False
+
+        return updated == 1
+
+    def fail_unfinished_jobs( self, error: str ) -> Optional[int]:
+        """Marks every pending or running job as failed.
+
+        Call this on startup, before any job is submitted: the work of unfinished jobs died with the process that ran them,
+        so they would otherwise stay unfinished forever.
+
+        Args:
+            error ( str ): The error message stored on the failed jobs.
+
+        Returns:
+            Optional[int]: The number of jobs marked as failed, or None if an error occurs.
+        """
+        query = sa.update( JobsModel ).where( JobsModel.status.in_( ( 'pending', 'running' ) ) ).values(
+            status='failed',
+            error=error,
+            updated_at=datetime.now( timezone.utc ).replace( tzinfo=None )
+        )
+
+        try:
+            with self.__engine.begin() as conn:
+                return conn.execute( query ).rowcount
+
+        except Exception as e:
+            print( f'Error occurred while failing unfinished jobs: { e }' )
+            return None
+
+    def get_job( self, job_id: UUID ) -> Optional[Dict[str, Any]]:
+        """Retrieves a background job based on its UUID.
+
+        Args:
+            job_id ( UUID ): The UUID of the job.
+
+        Returns:
+            Optional[Dict[str, Any]]: A dictionary representing the job with its result decoded, or None if an error occurs or no job is found.
+        """
+        query = sa.select( JobsModel ).where( JobsModel.id == str( job_id ) )
+
+        try:
+            with self.__engine.begin() as conn:
+                result = conn.execute( query ).fetchone()
+                result = result._asdict() if result else None
+
+        except Exception as e:
+            print( f'Error occurred while fetching job: { e }' )
+            return None
+
+        if result is not None and result[ 'result' ] is not None:
+            result[ 'result' ] = json.loads( result[ 'result' ] )
+
+        return result
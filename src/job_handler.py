@@ -0,0 +1,86 @@
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, Dict, Any, Callable
+from uuid import UUID
+from db_handler import DBhandler
+from webhook_handler import CallbackInterface
+
+class JobHandler:
+    """Runs work on a background thread pool and tracks it as jobs in the database.
+
+    Job state is stored through the DBhandler so it can be queried from any worker, including after a restart.
+    """
+
+    def __init__( self, db: DBhandler, max_workers: int = 4, callback: Optional[CallbackInterface] = None, debug: bool = False ):
+        """Initializes the JobHandler.
+
+        Args:
+            db ( DBhandler ): The database handler used to store job state.
+            max_workers ( int, optional ): The number of jobs run concurrently. Defaults to 4.
+            callback ( Optional[CallbackInterface], optional ): The interface used to notify callback URLs. Defaults to None.
+            debug ( bool, optional ): Enables debug logging. Defaults to False.
+        """
+        self.__db = db
+        self.__max_workers = max_workers
+        self.__executor = ThreadPoolExecutor( max_workers=max_workers, thread_name_prefix='job' )
+        self.__callback = callback
+        self.__debug = debug
+
+    def submit( self, kind: str, func: Callable[ ..., Dict[str, Any] ], *args: Any, callback_url: Optional[str] = None ) -> Optional[Dict[str, Any]]:
+        """Creates a job and schedules its work on the thread pool.
+
+        The work function returns the job result, or raises an exception whose message is stored as the job error.
+
+        Args:
+            kind ( str ): The kind of work the job performs.
+            func ( Callable[..., Dict[str, Any]] ): The work function.
+            *args ( Any ): The arguments passed to the work function.
+            callback_url ( Optional[str], optional ): The URL notified with the job when it finishes. Defaults to None.
+
+        Returns:
+            Optional[Dict[str, Any]]: A dictionary representing the created job, or None if it could not be created.
+        """
+        job = self.__db.create_job( kind=kind, callback_url=callback_url )
+
+        if job is None:
+            return None
+
+        self.__executor.submit( self.__run, job[ 'id' ], func, args, callback_url )
+
+        return job
+
+    def shutdown( self, wait: bool = True ):
+        """Stops accepting jobs and optionally waits for the running ones to finish.
+
+        Args:
+            wait ( bool, optional ): Whether to block until all submitted jobs have finished. Defaults to True.
+        """
+        self.__executor.shutdown( wait=wait )
+
+    def reset( self ):
+        """Creates a new thread pool. Call this in a forked worker process, which does not inherit the parent's threads."""
+        self.__executor = ThreadPoolExecutor( max_workers=self.__max_workers, thread_name_prefix='job' )
+
+    def __run( self, job_id: str, func: Callable[ ..., Dict[str, Any] ], args: tuple, callback_url: Optional[str] ):
+        """Runs a job's work function and records its outcome.
+
+        Args:
+            job_id ( str ): The ID of the job.
+            func ( Callable[..., Dict[str, Any]] ): The work function.
+            args ( tuple ): The arguments passed to the work function.
+            callback_url ( Optional[str] ): The URL notified with the job when it finishes.
+        """
+        self.__db.update_job( job_id, 'running' )
+
+        try:
+            result = func( *args )
+        except Exception as e:
+            if self.__debug: print( f'Error occurred while running job { job_id }: { e }' )
+            self.__db.update_job( job_id, 'failed', error=str( e ) )
+        else:
+            self.__db.update_job( job_id, 'succeeded', result=result )
+
+        if callback_url is not None and self.__callback is not None:
+            job = self.__db.get_job( UUID( job_id ) )
+
+            if job is not None:
+                self.__callback.notify( callback_url, { 'id': job[ 'id' ], 'status': job[ 'status' ], 'result': job[ 'result' ], 'error': job[ 'error' ] } )
@@ -0,0 +1,77 @@
+from typing import Any, cast
+from flask import Flask
+from flask.json.provider import DefaultJSONProvider
+from werkzeug.sansio.response import Response
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+class OrjsonProvider( DefaultJSONProvider ):
+    """JSON provider that encodes with orjson when it is installed.
+
+    UUIDs are encoded as canonical strings and datetimes as ISO 8601, matching the marshmallow schemas.
+    Other types are encoded like the default provider. Without orjson, or when formatting options
+    are passed, the default provider is used instead.
+    """
+
+    def __option( self ) -> int:
+        """Builds the orjson options matching the provider settings.
+
+        Returns:
+            int: The orjson option flags.
+        """
+        assert orjson is not None
+        option = orjson.OPT_NON_STR_KEYS
+        if self.sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        if ( self.compact is None and self._app.debug ) or self.compact is False:
+            option |= orjson.OPT_INDENT_2
+        return option
+
+    def dumps( self, obj: Any, **kwargs: Any ) -> str:
+        """Serializes data as JSON.
+
+        Args:
+            obj ( Any ): The data to serialize.
+            **kwargs: Arguments passed to json.dumps, which disable orjson.
+
+        Returns:
+            str: The JSON string.
+        """
+        if orjson is None or kwargs:
+            return super().dumps( obj, **kwargs )
+
+        return orjson.dumps( obj, default=self.default, option=self.__option() ).decode()
+
+    def loads( self, s: str | bytes, **kwargs: Any ) -> Any:
+        """Deserializes data from JSON.
+
+        Args:
+            s ( str | bytes ): The JSON text.
+            **kwargs: Arguments passed to json.loads, which disable orjson.
+
+        Returns:
+            Any: The deserialized data.
+        """
+        if orjson is None or kwargs:
+            return super().loads( s, **kwargs )
+
+        return orjson.loads( s )
+
+    def response( self, *args: Any, **kwargs: Any ) -> Response:
+        """Serializes the given arguments as a JSON response, encoding directly to bytes.
+
+        Args:
+            *args: A single value to serialize, or multiple values to serialize as a list.
+            **kwargs: Values to serialize as a dictionary.
+
+        Returns:
+            Response: The JSON response.
+        """
+        if orjson is None:
+            return super().response( *args, **kwargs )
+
+        obj = self._prepare_response_obj( args, kwargs )
+        return cast( Flask, self._app ).response_class( response=orjson.dumps( obj, default=self.default, option=self.__option() | orjson.OPT_APPEND_NEWLINE ), mimetype=self.mimetype )
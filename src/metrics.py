@@ -0,0 +1,135 @@
+import os
+from time import perf_counter
+from typing import Optional, Any, Tuple
+import sqlalchemy as sa
+from sqlalchemy.pool import QueuePool
+from flask import Flask, Response, request, g
+from prometheus_client import CollectorRegistry, Counter, Histogram, REGISTRY, CONTENT_TYPE_LATEST, generate_latest, multiprocess
+
+#* NOTE: Under Gunicorn, set PROMETHEUS_MULTIPROC_DIR to an empty directory before the app is imported.
+#* NOTE: Every worker then writes its samples to memory-mapped files there, and /metrics aggregates all of them.
+
+REQUEST_LATENCY = Histogram( 'http_request_duration_seconds', 'Time until the response of a request is ready, by route.', [ 'method', 'route' ] )
+REQUEST_COUNT = Counter( 'http_requests_total', 'Number of requests, by route and status code.', [ 'method', 'route', 'status' ] )
+DB_STATEMENT_LATENCY = Histogram(
+    'db_statement_duration_seconds', 'Execution time of database statements, by table and operation.', [ 'table', 'operation' ],
+    buckets=( 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0 )
+)
+DB_POOL_CHECKOUT_WAIT = Histogram(
+    'db_pool_checkout_wait_seconds', 'Time spent waiting to check a connection out of the pool.',
+    buckets=( 0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 30.0 )
+)
+UPSTREAM_LATENCY = Histogram( 'upstream_request_duration_seconds', 'Latency of requests to upstream services, by outcome.', [ 'upstream', 'outcome' ] )
+UPSTREAM_ERRORS = Counter( 'upstream_request_errors_total', 'Number of failed requests to upstream services, by error type.', [ 'upstream', 'error' ] )
+
+def instrument_app( app: Flask ):
+    """Registers the request hooks recording the latency and status of every request.
+
+    Requests are labeled by their URL rule rather than their path, so that IDs do not create new series.
+    For streamed responses the latency covers the time until the response starts.
+
+    Args:
+        app ( Flask ): The application to instrument.
+    """
+    @app.before_request
+    def start_timer():
+        g.request_start = perf_counter()
+
+    @app.after_request
+    def record_request( response: Response ) -> Response:
+        route = request.url_rule.rule if request.url_rule is not None else 'unmatched'
+        start = g.get( 'request_start' )
+
+        if start is not None:
+            REQUEST_LATENCY.labels( request.method, route ).observe( perf_counter() - start )
+        REQUEST_COUNT.labels( request.method, route, str( response.status_code ) ).inc()
+
+        return response
+
+def instrument_engine( engine: sa.Engine ):
+    """Records the execution time of every statement executed by an engine.
+
+    Args:
+        engine ( sa.Engine ): The engine to instrument.
+    """
+    @sa.event.listens_for( engine, 'before_cursor_execute' )
+    def start_timer( conn, cursor, statement, parameters, context, executemany ):
+        conn.info.setdefault( 'statement_start', [] ).append( perf_counter() )
+
+    @sa.event.listens_for( engine, 'after_cursor_execute' )
+    def record_statement( conn, cursor, statement, parameters, context, executemany ):
+        elapsed = perf_counter() - conn.info[ 'statement_start' ].pop()
+        DB_STATEMENT_LATENCY.labels( *_statement_labels( statement, context ) ).observe( elapsed )
+
+    @sa.event.listens_for( engine, 'handle_error' )
+    def discard_timer( exception_context ):
+        conn = exception_context.connection
+        if conn is not None and conn.info.get( 'statement_start' ):
+            conn.info[ 'statement_start' ].pop()
+
+def _statement_labels( statement: str, context: Any ) -> Tuple[str, str]:
+    """Derives the table and operation labels of a statement.
+
+    The table is taken from the compiled statement: the target of an INSERT, UPDATE or DELETE, or the first FROM of a SELECT.
+    Textual statements have no table.
+
+    Args:
+        statement ( str ): The SQL string.
+        context ( Any ): The execution context.
+
+    Returns:
+        Tuple[str, str]: The table and operation.
+    """
+    words = statement.split( None, 1 )
+    operation = words[ 0 ].upper() if words else 'UNKNOWN'
+
+    compiled = getattr( context, 'compiled', None )
+    clause = getattr( compiled, 'statement', None )
+    table = getattr( clause, 'table', None )
+
+    if table is None and isinstance( clause, sa.Select ):
+        froms = clause.get_final_froms()
+        table = froms[ 0 ] if froms else None
+
+    return getattr( table, 'name', None ) or 'none', operation
+
+class TimedQueuePool( QueuePool ):
+    """Queue pool that records how long each checkout waits, including any connection it has to open."""
+
+    def connect( self ) -> Any:
+        """Checks a connection out of the pool.
+
+        Returns:
+            Any: The pooled connection.
+        """
+        start = perf_counter()
+        try:
+            return super().connect()
+        finally:
+            DB_POOL_CHECKOUT_WAIT.observe( perf_counter() - start )
+
+def observe_upstream( upstream: str, latency: Optional[float], error: Optional[Exception] = None ):
+    """Records the outcome of a request to an upstream service.
+
+    Args:
+        upstream ( str ): The name of the upstream service.
+        latency ( Optional[float] ): The latency in seconds, or None if no request was sent.
+        error ( Optional[Exception], optional ): The error the request failed with. Defaults to None.
+    """
+    if latency is not None:
+        UPSTREAM_LATENCY.labels( upstream, 'success' if error is None else 'failure' ).observe( latency )
+    if error is not None:
+        UPSTREAM_ERRORS.labels( upstream, type( error ).__name__ ).inc()
+
+def render_metrics() -> Tuple[bytes, str]:
+    """Renders all metrics in the Prometheus text format, aggregated over all worker processes in multiprocess mode.
+
+    Returns:
+        Tuple[bytes, str]: The metrics and their content type.
+    """
+    if 'PROMETHEUS_MULTIPROC_DIR' in os.environ:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector( registry )
+        return generate_latest( registry ), CONTENT_TYPE_LATEST
+
+    return generate_latest( REGISTRY ), CONTENT_TYPE_LATEST
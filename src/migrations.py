@@ -0,0 +1,144 @@
+import sqlalchemy as sa
+from datetime import datetime, timezone
+from typing import Callable, Dict, List, Tuple
+from uuid import UUID
+
+#* NOTE: Migrations are applied in order of version and each one runs in its own transaction.
+#* NOTE: Never edit or reorder a released migration; append a new one instead.
+
+_metadata = sa.MetaData()
+
+schema_migrations = sa.Table(
+    'schema_migrations',
+    _metadata,
+    sa.Column( 'version', sa.Integer, primary_key=True ),
+    sa.Column( 'description', sa.String, nullable=False ),
+    sa.Column( 'applied_at', sa.DateTime, nullable=False )
+)
+
+#* NOTE: Migrations spell out their own DDL instead of reading the models, so that they keep doing what they did when
+#* NOTE: they were released as the models change. Tables that do not exist yet are skipped, since the app never creates
+#* NOTE: tables itself: new databases are created from test/db/test_db.sql, which has the current schema and every index.
+
+_jobs_v1 = sa.Table(
+    'jobs',
+    _metadata,
+    sa.Column( 'id', sa.String, primary_key=True ),
+    sa.Column( 'kind', sa.String, nullable=False ),
+    sa.Column( 'status', sa.String, nullable=False ),
+    sa.Column( 'result', sa.Text, nullable=True ),
+    sa.Column( 'error', sa.String, nullable=True ),
+    sa.Column( 'callback_url', sa.String, nullable=True ),
+    sa.Column( 'created_at', sa.DateTime, nullable=False ),
+    sa.Column( 'updated_at', sa.DateTime, nullable=False )
+)
+
+_LOOKUP_INDEXES: List[ Tuple[ str, str, Tuple[ str, ... ] ] ] = [
+    ( 'ix_image_sets_patient_id', 'image_sets', ( 'patient_id', ) ),
+    ( 'ix_images_set_id', 'images', ( 'set_id', ) ),
+    ( 'ix_images_patient_id_image_timestamp', 'images', ( 'patient_id', 'image_timestamp' ) ),
+    ( 'ix_assessments_image_id', 'assessments', ( 'image_id', ) ),
+    ( 'ix_assessments_set_id', 'assessments', ( 'set_id', ) ),
+    ( 'ix_assessments_patient_id_assessment_timestamp', 'assessments', ( 'patient_id', 'assessment_timestamp' ) )
+]
+
+_UUID_COLUMNS: Dict[ str, Tuple[ str, ... ] ] = {
+    'patients': ( 'id', ),
+    'image_sets': ( 'id', 'patient_id' ),
+    'images': ( 'id', 'set_id', 'patient_id' ),
+    'assessments': ( 'id', 'image_id', 'set_id', 'patient_id' ),
+    'jobs': ( 'id', )
+}
+
+def _create_jobs_table( conn: sa.Connection ):
+    """Creates the background jobs table."""
+    _jobs_v1.create( conn, checkfirst=True )
+
+def _create_lookup_indexes( conn: sa.Connection ):
+    """Creates the foreign key and ( patient_id, timestamp ) indexes."""
+    inspector = sa.inspect( conn )
+
+    for name, table_name, columns in _LOOKUP_INDEXES:
+        if inspector.has_table( table_name ):
+            conn.exec_driver_sql( f'CREATE INDEX IF NOT EXISTS { name } ON { table_name } ( { ", ".join( columns ) } )' )
+
+def _convert_uuid_columns( conn: sa.Connection ):
+    """Converts UUIDs stored as text into the compact BinaryUUID representation.
+
+    On SQLite the values are rewritten as 16-byte BLOBs in batches, with foreign key checks deferred to commit.
+    On PostgreSQL the columns are altered to the native UUID type, with foreign keys dropped and recreated around it.
+    """
+    inspector = sa.inspect( conn )
+    tables = { name: columns for name, columns in _UUID_COLUMNS.items() if inspector.has_table( name ) }
+
+    if conn.dialect.name == 'sqlite':
+        #* NOTE: pysqlite only opens the transaction on the first DML statement, so it is opened explicitly for the PRAGMA to take effect.
+        driver_connection = conn.connection.driver_connection
+        if driver_connection is None or not driver_connection.in_transaction:
+            conn.exec_driver_sql( 'BEGIN' )
+        conn.exec_driver_sql( 'PRAGMA defer_foreign_keys = ON' )
+
+        for table_name, columns in tables.items():
+            is_text = ' OR '.join( f"typeof( { c } ) = 'text'" for c in columns )
+            select = f'SELECT rowid, { ", ".join( columns ) } FROM { table_name } WHERE rowid > ? AND ( { is_text } ) ORDER BY rowid LIMIT 50000'
+            update = f'UPDATE { table_name } SET { ", ".join( f"{ c } = ?" for c in columns ) } WHERE rowid = ?'
+
+            last_rowid = 0
+            while rows := conn.exec_driver_sql( select, ( last_rowid, ) ).fetchall():
+                conn.exec_driver_sql( update, [ tuple( UUID( v ).bytes if isinstance( v, str ) else v for v in row[1:] ) + ( row[0], ) for row in rows ] )
+                last_rowid = rows[ -1 ][ 0 ]
+
+    elif conn.dialect.name == 'postgresql':
+        inspector = sa.inspect( conn )
+        foreign_keys = { table_name: inspector.get_foreign_keys( table_name ) for table_name in tables }
+
+        for table_name, fks in foreign_keys.items():
+            for fk in fks:
+                conn.exec_driver_sql( f'ALTER TABLE { table_name } DROP CONSTRAINT { fk[ "name" ] }' )
+
+        for table_name, columns in tables.items():
+            for column in columns:
+                conn.exec_driver_sql( f'ALTER TABLE { table_name } ALTER COLUMN { column } TYPE uuid USING { column }::uuid' )
+
+        for table_name, fks in foreign_keys.items():
+            for fk in fks:
+                conn.exec_driver_sql(
+                    f'ALTER TABLE { table_name } ADD CONSTRAINT { fk[ "name" ] } FOREIGN KEY ( { ", ".join( fk[ "constrained_columns" ] ) } ) '
+                    f'REFERENCES { fk[ "referred_table" ] } ( { ", ".join( fk[ "referred_columns" ] ) } )'
+                )
+
+    else:
+        raise NotImplementedError( f'UUID conversion is not supported on { conn.dialect.name }' )
+
+MIGRATIONS: List[ Tuple[ int, str, Callable[ [ sa.Connection ], None ] ] ] = [
+    ( 1, 'Create jobs table', _create_jobs_table ),
+    ( 2, 'Index foreign keys and patient timestamps', _create_lookup_indexes ),
+    ( 3, 'Store UUIDs in binary form', _convert_uuid_columns )
+]
+
+def run_migrations( engine: sa.Engine ) -> int:
+    """Applies all migrations that have not been applied to the database yet.
+
+    Args:
+        engine ( sa.Engine ): The database engine.
+
+    Returns:
+        int: The schema version of the database after migrating.
+    """
+    schema_migrations.create( engine, checkfirst=True )
+
+    with engine.begin() as conn:
+        applied = set( conn.execute( sa.select( schema_migrations.c.version ) ).scalars() )
+
+    for version, description, migrate in MIGRATIONS:
+        if version in applied:
+            continue
+
+        with engine.begin() as conn:
+            migrate( conn )
+            conn.execute( sa.insert( schema_migrations ).values( version=version, description=description, applied_at=datetime.now( timezone.utc ) ) )
+
+        print( f'Applied migration { version }: { description }' )
+        applied.add( version )
+
+    return max( applied, default=0 )
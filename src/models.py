@@ -1,6 +1,8 @@
 from datetime import datetime
 from uuid import UUID
-from sqlalchemy import ForeignKey, String as id_type
+from typing import Optional
+from sqlalchemy import ForeignKey, Index, LargeBinary, Text, TypeDecorator, Dialect
+from sqlalchemy.dialects import postgresql
 from sqlalchemy.orm import ( 
 
     DeclarativeBase,
@@ -12,6 +14,68 @@ from sqlalchemy.orm import (
 
 # pylint: disable=unsubscriptable-object
 
+class BinaryUUID( TypeDecorator ):
+    """Stores UUIDs compactly: as a native UUID on PostgreSQL and as a 16-byte BLOB elsewhere.
+
+    Accepts UUID objects or UUID strings as parameters and always returns UUID objects.
+    """
+    impl = LargeBinary( 16 )
+    cache_ok = True
+
+    @property
+    def python_type( self ):
+        """The Python type of values of this type, used by the marshmallow schemas to pick a UUID field."""
+        return UUID
+
+    def load_dialect_impl( self, dialect: Dialect ):
+        """Selects the column type for a dialect.
+
+        Args:
+            dialect ( Dialect ): The database dialect.
+
+        Returns:
+            The native UUID type on PostgreSQL, or a 16-byte binary type otherwise.
+        """
+        if dialect.name == 'postgresql':
+            return dialect.type_descriptor( postgresql.UUID( as_uuid=True ) )
+        return dialect.type_descriptor( LargeBinary( 16 ) )
+
+    def process_bind_param( self, value, dialect: Dialect ):
+        """Converts a UUID or UUID string into its database representation.
+
+        Args:
+            value: The UUID or UUID string.
+            dialect ( Dialect ): The database dialect.
+
+        Returns:
+            The UUID on PostgreSQL, or its 16 bytes otherwise.
+        """
+        if value is None:
+            return None
+        if not isinstance( value, UUID ):
+            value = UUID( str( value ) )
+        return value if dialect.name == 'postgresql' else value.bytes
+
+    def process_result_value( self, value, dialect: Dialect ):
+        """Converts a database value into a UUID.
+
+        Text values that have not been migrated yet are also accepted.
+
+        Args:
+            value: The database value.
+            dialect ( Dialect ): The database dialect.
+
+        Returns:
+            The UUID.
+        """
+        if value is None or isinstance( value, UUID ):
+            return value
+        if isinstance( value, str ):
+            return UUID( value )
+        return UUID( bytes=bytes( value ) )
+
+id_type = BinaryUUID
+
 class _Base( DeclarativeBase ):
     """Base class for SQLAlchemy models.
 
@@ -46,7 +110,7 @@ class ImageSetsModel( _Base ):
     """
     __tablename__ = 'image_sets'
     id: Mapped[ UUID ] = mapped_column( id_type, primary_key=True )
-    patient_id: Mapped[ UUID ] = mapped_column( ForeignKey( 'patients.id' ) )
+    patient_id: Mapped[ UUID ] = mapped_column( ForeignKey( 'patients.id' ), index=True )
     patient: Mapped[ PatientsModel ] = relationship( PatientsModel, foreign_keys=[ patient_id ] )
 
 class ImagesModel( _Base ):
@@ -55,8 +119,9 @@ class ImagesModel( _Base ):
     Stores image information like ID, set ID, patient ID, timestamp, and URI.
     """
     __tablename__ = 'images'
+    __table_args__ = ( Index( 'ix_images_patient_id_image_timestamp', 'patient_id', 'image_timestamp' ), )
     id: Mapped[ UUID ] = mapped_column( id_type, primary_key=True )
-    set_id: Mapped[ UUID ] = mapped_column( ForeignKey( 'image_sets.id' ) )
+    set_id: Mapped[ UUID ] = mapped_column( ForeignKey( 'image_sets.id' ), index=True )
     patient_id: Mapped[ UUID ] = mapped_column( ForeignKey( 'patients.id' ) )
     image_set: Mapped[ ImageSetsModel ] = relationship( ImageSetsModel, foreign_keys=[ set_id, patient_id ] )
     image_timestamp: Mapped[ datetime ] = mapped_column( nullable=False )
@@ -68,10 +133,26 @@ class AssessmentsModel( _Base ):
     Stores assessment information like ID, image ID, patient ID, timestamp, and the assessment result.
     """
     __tablename__ = 'assessments'
+    __table_args__ = ( Index( 'ix_assessments_patient_id_assessment_timestamp', 'patient_id', 'assessment_timestamp' ), )
     id: Mapped[ UUID ] = mapped_column( id_type, primary_key=True )
-    image_id: Mapped[ UUID ] = mapped_column( ForeignKey( 'images.id' ) )
-    set_id: Mapped[ UUID ] = mapped_column( ForeignKey( 'image_sets.id' ) )
+    image_id: Mapped[ UUID ] = mapped_column( ForeignKey( 'images.id' ), index=True )
+    set_id: Mapped[ UUID ] = mapped_column( ForeignKey( 'image_sets.id' ), index=True )
     patient_id: Mapped[ UUID ] = mapped_column( ForeignKey( 'patients.id' ) )
     image: Mapped[ ImagesModel ] = relationship( ImagesModel, foreign_keys=[ image_id, set_id, patient_id ] )
     assessment_timestamp: Mapped[ datetime ] = mapped_column( nullable=False )
     assessment: Mapped[ bool ] = mapped_column( nullable=False )
+
+class JobsModel( _Base ):
+    """Represents a background job in the database.
+
+    Stores the job kind, its status, and its result or error once it has finished.
+    """
+    __tablename__ = 'jobs'
+    id: Mapped[ UUID ] = mapped_column( id_type, primary_key=True )
+    kind: Mapped[ str ] = mapped_column( nullable=False )
+    status: Mapped[ str ] = mapped_column( nullable=False )
+    result: Mapped[ Optional[ str ] ] = mapped_column( Text, nullable=True )
+    error: Mapped[ Optional[ str ] ] = mapped_column( nullable=True )
+    callback_url: Mapped[ Optional[ str ] ] = mapped_column( nullable=True )
+    created_at: Mapped[ datetime ] = mapped_column( nullable=False )
+    updated_at: Mapped[ datetime ] = mapped_column( nullable=False )
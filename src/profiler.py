@@ -0,0 +1,125 @@
+import hmac
+import os
+import sys
+import threading
+from collections import Counter
+from datetime import datetime, timezone
+from typing import Optional
+from flask import Flask, Response, request, g
+
+class StackSampler:
+    """Samples the call stack of one thread at a fixed interval.
+
+    Samples are aggregated as folded stacks ( 'outer;inner count' lines ), the input format of
+    flamegraph.pl, speedscope and most other flame graph tools.
+    """
+
+    def __init__( self, thread_id: int, interval: float ):
+        """Initializes the sampler.
+
+        Args:
+            thread_id ( int ): The identifier of the thread to sample.
+            interval ( float ): The number of seconds between samples.
+        """
+        self.__thread_id = thread_id
+        self.__interval = interval
+        self.__stacks: Counter = Counter()
+        self.__stopped = threading.Event()
+        self.__thread = threading.Thread( target=self.__run, daemon=True )
+
+    def start( self ):
+        """Starts sampling in a background thread."""
+        self.__thread.start()
+
+    def stop( self ) -> str:
+        """Stops sampling.
+
+        Returns:
+            str: The folded stacks, one per line, with the number of samples in which each was seen.
+        """
+        self.__stopped.set()
+        if self.__thread.is_alive():
+            self.__thread.join()
+        return ''.join( f'{ stack } { count }\n' for stack, count in self.__stacks.most_common() )
+
+    def __run( self ):
+        """Records a sample every interval until stopped."""
+        while not self.__stopped.wait( self.__interval ):
+            frame = sys._current_frames().get( self.__thread_id )
+            stack = []
+
+            while frame is not None:
+                code = frame.f_code
+                stack.append( f'{ code.co_name } ({ os.path.basename( code.co_filename ) }:{ frame.f_lineno })' )
+                frame = frame.f_back
+
+            if stack:
+                self.__stacks[ ';'.join( reversed( stack ) ) ] += 1
+
+class RequestProfiler:
+    """Profiles requests that opt in with the X-Profile header set to the profiling token.
+
+    The folded stacks of a profiled request are written to the profile folder, and their file name is returned
+    in the X-Profile response header. Streamed responses are only profiled until the response starts.
+    Requests without the header are not affected beyond a header lookup.
+    """
+
+    def __init__( self, app: Flask, token: str, folder_path: str = './profiles', interval: float = 0.005 ):
+        """Initializes the profiler and registers it on an application.
+
+        Args:
+            app ( Flask ): The application whose requests can be profiled.
+            token ( str ): The secret a request must send in the X-Profile header to be profiled.
+            folder_path ( str, optional ): The folder the profiles are written to. Defaults to './profiles'.
+            interval ( float, optional ): The number of seconds between stack samples. Defaults to 0.005.
+        """
+        self.__token = token.encode()
+        self.__folder_path = folder_path
+        self.__interval = interval
+
+        app.before_request( self.__start )
+        app.after_request( self.__finish )
+        app.teardown_request( self.__stop )
+
+    def __start( self ):
+        """Starts sampling the current request if it sent the profiling token."""
+        token = request.headers.get( 'X-Profile' )
+
+        if token is not None and hmac.compare_digest( token.encode(), self.__token ):
+            g.profile_sampler = StackSampler( threading.get_ident(), self.__interval )
+            g.profile_sampler.start()
+
+    def __finish( self, response: Response ) -> Response:
+        """Stops sampling the current request and writes its profile.
+
+        Args:
+            response ( Response ): The response of the request.
+
+        Returns:
+            Response: The response, with the profile file name in the X-Profile header.
+        """
+        sampler: Optional[StackSampler] = g.pop( 'profile_sampler', None )
+
+        if sampler is None:
+            return response
+
+        file_name = f'{ datetime.now( timezone.utc ).strftime( "%Y%m%dT%H%M%S%f" ) }-{ request.endpoint or "unmatched" }.folded'
+
+        try:
+            os.makedirs( self.__folder_path, exist_ok=True )
+            with open( os.path.join( self.__folder_path, file_name ), 'w' ) as f:
+                f.write( sampler.stop() )
+
+        except OSError as e:
+            print( f'Error occurred while saving profile: { e }' )
+            return response
+
+        response.headers[ 'X-Profile' ] = file_name
+        return response
+
+    def __stop( self, _ ):
+        """Stops the sampler of a request that failed before its response was ready."""
+        sampler: Optional[StackSampler] = g.pop( 'profile_sampler', None )
+
+        if sampler is not None:
+            sampler.stop()
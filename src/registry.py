@@ -0,0 +1,60 @@
+from functools import lru_cache
+from typing import Optional, Dict, Sequence, Type, Any
+from marshmallow_sqlalchemy import SQLAlchemySchema
+from models import PatientsModel, ImageSetsModel, ImagesModel, AssessmentsModel, JobsModel
+from schemas import ImageSetsSchema, PatientsSchema, ImagesSchema, AssessmentsSchema, ImagesImportSchema, AssessmentsImportSchema, JobsSchema
+
+#* NOTE: Schemas are built once at import and shared by all requests, since building an SQLAlchemyAutoSchema
+#* NOTE: reflects the model. Pass many=True to load and dump instead of building a many=True schema.
+
+class TableSchemas:
+    """Pairs a table's model with its prebuilt schemas."""
+
+    def __init__( self, model: Any, schema_class: Type[SQLAlchemySchema], import_schema_class: Optional[Type[SQLAlchemySchema]] = None ):
+        """Initializes the table entry and builds its schemas.
+
+        Args:
+            model ( Any ): The SQLAlchemy model of the table.
+            schema_class ( Type[SQLAlchemySchema] ): The schema used to load new entries and dump entries.
+            import_schema_class ( Optional[Type[SQLAlchemySchema]], optional ): The schema used to load existing records, if it differs from schema_class. Defaults to None.
+        """
+        self.model = model
+        self.schema: SQLAlchemySchema = schema_class()
+        self.import_schema: SQLAlchemySchema = import_schema_class() if import_schema_class is not None else self.schema
+        self.__schema_class = schema_class
+        self.__projected_schema = lru_cache( maxsize=64 )( self.__build_projected_schema )
+
+    def __build_projected_schema( self, columns: tuple ) -> SQLAlchemySchema:
+        """Builds a schema restricted to the given columns.
+
+        Args:
+            columns ( tuple ): The names of the columns to dump.
+
+        Returns:
+            SQLAlchemySchema: The restricted schema.
+        """
+        return self.__schema_class( only=columns )
+
+    def projected_schema( self, columns: Optional[Sequence[str]] = None ) -> SQLAlchemySchema:
+        """Retrieves the schema dumping only the given columns. The most recently used projections are cached.
+
+        Args:
+            columns ( Optional[Sequence[str]], optional ): The names of the columns to dump, or None for all columns. Defaults to None.
+
+        Returns:
+            SQLAlchemySchema: The schema.
+        """
+        if not columns:
+            return self.schema
+
+        return self.__projected_schema( tuple( columns ) )
+
+TABLES: Dict[str, TableSchemas] = {
+    'patients': TableSchemas( PatientsModel, PatientsSchema ),
+    'image_sets': TableSchemas( ImageSetsModel, ImageSetsSchema ),
+    'images': TableSchemas( ImagesModel, ImagesSchema, ImagesImportSchema ),
+    'assessments': TableSchemas( AssessmentsModel, AssessmentsSchema, AssessmentsImportSchema )
+}
+
+#* NOTE: Jobs are not listed in TABLES since they are only exposed through the jobs routes.
+JOBS = TableSchemas( JobsModel, JobsSchema )
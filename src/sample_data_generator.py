@@ -1,6 +1,87 @@
 from jsf import JSF
+from faker import Faker
 import json
-from typing import Optional, Dict, List, Any
+import random
+import sys
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, Future
+from contextlib import contextmanager
+from contextvars import ContextVar
+from multiprocessing import get_context
+from os import path, remove, replace
+from threading import Lock
+from typing import Optional, Dict, List, Any, Iterator, Deque
+
+#* NOTE: JSF takes no random generators. Its schema types call the random module's functions and its own module-level
+#* NOTE: Faker instances, so those are pointed once, at import, to a generator that draws from the seeded generator of the
+#* NOTE: chunk being generated in the current thread, and from an unseeded one otherwise. Seeding a chunk never touches
+#* NOTE: state shared with other generations, so concurrent generations need no lock.
+_chunk_random: ContextVar[Optional[random.Random]] = ContextVar( '_chunk_random', default=None )
+
+class _ChunkRandom( random.Random ):
+    """Random generator that draws from the generator of the chunk being generated, or from a default one otherwise.
+
+    Every other method of random.Random is built on random() and getrandbits(), so overriding them is enough.
+    """
+
+    def __init__( self, default: random.Random ):
+        """Initializes the generator.
+
+        Args:
+            default ( random.Random ): The generator drawn from while no chunk is being generated.
+        """
+        super().__init__()
+        self.__default = default
+
+    def __current( self ) -> random.Random:
+        """Retrieves the generator to draw from.
+
+        Returns:
+            random.Random: The generator of the current chunk, or the default one.
+        """
+        return _chunk_random.get() or self.__default
+
+    def random( self ) -> float:
+        return self.__current().random()
+
+    def getrandbits( self, k: int ) -> int:
+        return self.__current().getrandbits( k )
+
+_jsf_random = _ChunkRandom( random.Random() )
+
+def _bind_jsf_generators():
+    """Points the random module and Faker instances used by the loaded JSF modules to chunk-aware generators."""
+    for name, module in list( sys.modules.items() ):
+        if not name.startswith( 'jsf.' ) or module is None:
+            continue
+
+        if getattr( module, 'random', None ) is random:
+            setattr( module, 'random', _jsf_random )
+
+        faker = getattr( module, 'faker', None )
+        if isinstance( faker, Faker ):
+            for factory in faker.factories:
+                if not isinstance( factory.random, _ChunkRandom ):
+                    factory.random = _ChunkRandom( factory.random )
+
+_bind_jsf_generators()
+
+@contextmanager
+def _seeded_generators( seed: Optional[int] ) -> Iterator[None]:
+    """Makes JSF draw from a generator seeded for one chunk in the current thread, or from the default ones if no seed is given.
+
+    Args:
+        seed ( Optional[int] ): The seed of the chunk, or None to leave the generators unseeded.
+    """
+    if seed is None:
+        yield
+        return
+
+    token = _chunk_random.set( random.Random( seed ) )
+    try:
+        yield
+    finally:
+        _chunk_random.reset( token )
 
 class DataGenerator:
     """Generates sample data based on a JSON schema."""
@@ -15,6 +96,29 @@ class DataGenerator:
         self.__json_schema_path = json_schema_path
         self.__save_as_json = save_as_json
         self.__json_save_path = json_save_path
+        self.__jsf: Optional[JSF] = None
+        self.__jsf_mtime: Optional[float] = None
+        self.__jsf_lock = Lock()
+
+    def __get_jsf( self ) -> JSF:
+        """Retrieves the compiled JSF generator, loading it on first use and reloading it when the schema file changes.
+
+        Returns:
+            JSF: The compiled JSF generator.
+        """
+        mtime = path.getmtime( self.__json_schema_path )
+
+        if self.__jsf is not None and self.__jsf_mtime == mtime:
+            return self.__jsf
+
+        with self.__jsf_lock:
+            if self.__jsf is None or self.__jsf_mtime != mtime:
+                jsf = JSF.from_json( self.__json_schema_path )
+                jsf.base_context = { **jsf.base_context, 'random': _jsf_random }
+                self.__jsf = jsf
+                self.__jsf_mtime = mtime
+
+        return self.__jsf
 
     def __fix_inconsistencies( self, data: dict ) -> Dict[str, Any]:
         """Fixes inconsistencies in the generated data.
@@ -41,22 +145,19 @@ class DataGenerator:
 
         return data.copy()
 
-    def generate_data( self, num=1 ) -> Optional[List[Dict[str, Any]]]:
-        """Generates sample data based on the provided JSON schema.
+    def __generate( self, jsf: JSF, num: int, seed: Optional[int] = None ) -> List[Dict[str, Any]]:
+        """Generates and fixes a number of data samples.
 
         Args:
-            num ( int, optional ): The number of data samples to generate. Defaults to 1.
+            jsf ( JSF ): The compiled JSF generator.
+            num ( int ): The number of data samples to generate.
+            seed ( Optional[int], optional ): The seed for the random generators, or None to leave them unseeded. Defaults to None.
 
         Returns:
-            Optional[List[Dict[str, Any]]]: A list of generated data samples, or None if an error occurred.
+            List[Dict[str, Any]]: A list of generated data samples.
         """
-        try:
-            jsf = JSF.from_json( self.__json_schema_path )
-        except Exception as e:
-            print( f'Error occurred while loading JSON schema: {e}' )
-            return None
-
-        sample_data = jsf.generate( n=num )
+        with _seeded_generators( seed ):
+            sample_data = jsf.generate( n=num )
         if num == 1:
             sample_data = [ sample_data ]
 
@@ -69,10 +170,148 @@ class DataGenerator:
         else:
             sample_data = [ self.__fix_inconsistencies( d ) for d in sample_data ]
 
-        print( sample_data )
+        return sample_data
+
+    def generate_data( self, num=1, seed=None ) -> Optional[List[Dict[str, Any]]]:
+        """Generates sample data based on the provided JSON schema.
+
+        Args:
+            num ( int, optional ): The number of data samples to generate. Defaults to 1.
+            seed ( int, optional ): The seed for the random generators. If None, the generators are left unseeded.
+
+        Returns:
+            Optional[List[Dict[str, Any]]]: A list of generated data samples, or None if an error occurred.
+        """
+        try:
+            jsf = self.__get_jsf()
+        except Exception as e:
+            print( f'Error occurred while loading JSON schema: {e}' )
+            return None
+
+        sample_data = self.__generate( jsf, num, seed )
 
         if self.__save_as_json:
             with open( self.__json_save_path or 'generated_data.json', 'w' ) as f:
                 json.dump( sample_data, f, indent=4 )
 
         return sample_data
+
+    def stream_data( self, num=1, chunk_size=1000, processes=1, seed=None ) -> Optional[Iterator[Dict[str, Any]]]:
+        """Generates sample data lazily, one chunk at a time.
+
+        When there is more than one chunk and more than one process, chunks are generated in parallel
+        in a process pool. Each chunk is seeded with the base seed plus its index, so the output for a given seed
+        does not depend on the number of processes.
+
+        Args:
+            num ( int, optional ): The number of data samples to generate. Defaults to 1.
+            chunk_size ( int, optional ): The number of data samples generated per chunk. Defaults to 1000.
+            processes ( int, optional ): The number of processes used to generate chunks. Defaults to 1.
+            seed ( int, optional ): The base seed for the random generators. If None, a random base seed is used.
+
+        Returns:
+            Optional[Iterator[Dict[str, Any]]]: An iterator over the generated data samples, or None if an error occurred.
+        """
+        try:
+            jsf = self.__get_jsf()
+        except Exception as e:
+            print( f'Error occurred while loading JSON schema: {e}' )
+            return None
+
+        base_seed = seed if seed is not None else random.randrange( 2**32 )
+        sizes = [ min( chunk_size, num - start ) for start in range( 0, num, chunk_size ) ]
+        seeds = [ base_seed + i for i in range( len( sizes ) ) ]
+
+        if len( sizes ) > 1 and processes > 1:
+            samples = self.__stream_parallel( sizes, seeds, processes )
+        else:
+            samples = ( sample for size, chunk_seed in zip( sizes, seeds ) for sample in self.__generate( jsf, size, chunk_seed ) )
+
+        return self.__save_incrementally( samples ) if self.__save_as_json else samples
+
+    def __stream_parallel( self, sizes: List[int], seeds: List[int], processes: int ) -> Iterator[Dict[str, Any]]:
+        """Generates chunks of data samples in a process pool and yields them in order.
+
+        At most one chunk per process is generated ahead of the chunk being yielded, so a slow reader does not make
+        finished chunks pile up. Closing the iterator cancels the chunks that have not started and returns without
+        waiting for the running ones.
+
+        Args:
+            sizes ( List[int] ): The number of data samples in each chunk.
+            seeds ( List[int] ): The seed of each chunk.
+            processes ( int ): The number of processes.
+
+        Yields:
+            Dict[str, Any]: A generated data sample.
+        """
+        pool = ProcessPoolExecutor( max_workers=processes, mp_context=get_context( 'spawn' ) )
+        chunks = iter( zip( sizes, seeds ) )
+        pending: Deque[Future] = deque()
+
+        try:
+            for size, chunk_seed in chunks:
+                pending.append( pool.submit( _generate_chunk, self.__json_schema_path, size, chunk_seed ) )
+                if len( pending ) >= processes:
+                    break
+
+            while pending:
+                chunk = pending.popleft().result()
+
+                next_chunk = next( chunks, None )
+                if next_chunk is not None:
+                    pending.append( pool.submit( _generate_chunk, self.__json_schema_path, *next_chunk ) )
+
+                yield from chunk
+
+        finally:
+            pool.shutdown( wait=False, cancel_futures=True )
+
+    def __save_incrementally( self, samples: Iterator[Dict[str, Any]] ) -> Iterator[Dict[str, Any]]:
+        """Writes data samples to the JSON save file as they pass through.
+
+        The samples are written to a temporary file that replaces the save file once all of them are written,
+        so a stream that is closed early leaves the previous save file untouched.
+
+        Args:
+            samples ( Iterator[Dict[str, Any]] ): The data samples.
+
+        Yields:
+            Dict[str, Any]: Each data sample, after it has been written.
+        """
+        save_path = self.__json_save_path or 'generated_data.json'
+        temp_path = f'{ save_path }.tmp'
+
+        try:
+            with open( temp_path, 'w' ) as f:
+                f.write( '[' )
+                for i, sample in enumerate( samples ):
+                    f.write( ',\n' if i else '\n' )
+                    f.write( json.dumps( sample, indent=4 ) )
+                    yield sample
+                f.write( '\n]' )
+        except BaseException:
+            remove( temp_path )
+            raise
+
+        replace( temp_path, save_path )
+
+_chunk_generators: Dict[str, DataGenerator] = {}
+
+def _generate_chunk( json_schema_path: str, num: int, seed: int ) -> List[Dict[str, Any]]:
+    """Generates a chunk of data samples in a worker process.
+
+    The data generator of each schema is kept for the lifetime of the worker process.
+
+    Args:
+        json_schema_path ( str ): Path to the JSON schema file.
+        num ( int ): The number of data samples to generate.
+        seed ( int ): The seed for the random generators.
+
+    Returns:
+        List[Dict[str, Any]]: A list of generated data samples.
+    """
+    if json_schema_path not in _chunk_generators:
+        _chunk_generators[ json_schema_path ] = DataGenerator( json_schema_path )
+
+    datagen = _chunk_generators[ json_schema_path ]
+    return datagen.generate_data( num, seed ) or []
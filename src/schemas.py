@@ -1,6 +1,7 @@
+from marshmallow import fields
 from marshmallow_sqlalchemy import SQLAlchemyAutoSchema, auto_field
 from marshmallow_sqlalchemy.fields import Related
-from models import PatientsModel, ImageSetsModel, ImagesModel, AssessmentsModel
+from models import PatientsModel, ImageSetsModel, ImagesModel, AssessmentsModel, JobsModel
 
 #TODO: FIX Nested types to load and dump properly
 
@@ -67,3 +68,34 @@ class AssessmentsSchema( SQLAlchemyAutoSchema ):
     assessment = auto_field( dump_only=True )
     assessment_timestamp = auto_field( dump_only=True )
     image = auto_field( dump_only=True )
+
+class ImagesImportSchema( ImagesSchema ):
+    """
+    Schema for importing existing image records.
+
+    Unlike ImagesSchema, the image timestamp is loaded from the input since the image
+    was captured outside of this API.
+    """
+    image_timestamp = auto_field()
+
+class AssessmentsImportSchema( AssessmentsSchema ):
+    """
+    Schema for importing existing assessment records.
+
+    Unlike AssessmentsSchema, the assessment result and timestamp are loaded from the input since
+    the image was analyzed outside of this API.
+    """
+    assessment = auto_field()
+    assessment_timestamp = auto_field()
+
+class JobsSchema( SQLAlchemyAutoSchema ):
+    """
+    Schema for the JobsModel.
+
+    Handles serialization of background job status, with the job result as decoded JSON.
+    """
+    class Meta:
+        model = JobsModel
+        load_instance = False
+
+    result = fields.Raw( dump_only=True )
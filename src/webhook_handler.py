@@ -1,5 +1,214 @@
+import json
 import requests as req
-from typing import Optional, Dict, Any
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from concurrent.futures import ThreadPoolExecutor, wait, as_completed
+from threading import Lock
+from time import monotonic, perf_counter
+from typing import Optional, Dict, Any, List
+from metrics import observe_upstream
+
+def _encode_json( payload: Any ) -> str:
+    """Encodes a JSON payload, serializing values such as UUIDs and datetimes as strings.
+
+    Args:
+        payload ( Any ): The payload to encode.
+
+    Returns:
+        str: The encoded payload.
+    """
+    return json.dumps( payload, default=str )
+
+def _create_session( pool_size: int, retries: int, backoff_factor: float ) -> req.Session:
+    """Creates a keep-alive HTTP session with a sized connection pool.
+
+    Only idempotent ( GET ) requests are retried, with exponential backoff, on connection errors and gateway failures.
+
+    Args:
+        pool_size ( int ): The number of connections kept alive per host.
+        retries ( int ): The maximum number of retries for idempotent requests.
+        backoff_factor ( float ): The backoff factor applied between retries.
+
+    Returns:
+        req.Session: The configured session.
+    """
+    retry = Retry(
+        total=retries,
+        backoff_factor=backoff_factor,
+        status_forcelist=( 502, 503, 504 ),
+        allowed_methods=frozenset( { 'GET' } ),
+        raise_on_status=False
+    )
+    adapter = HTTPAdapter( pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry )
+
+    session = req.Session()
+    session.mount( 'http://', adapter )
+    session.mount( 'https://', adapter )
+
+    return session
+
+class CircuitOpenError( req.exceptions.RequestException ):
+    """Raised instead of sending a request while an upstream's circuit is open."""
+
+class CircuitBreaker:
+    """Tracks the health of an upstream service and rejects calls while it is failing.
+
+    The circuit opens after a number of consecutive failed or slow calls, rejects every call until the reset timeout
+    has passed, then lets a single trial call through ( half-open ) that either closes it again or reopens it.
+    """
+
+    def __init__( self, name: str, failure_threshold: int = 5, latency_threshold: Optional[float] = None, reset_timeout: float = 30.0 ):
+        """Initializes the CircuitBreaker.
+
+        Args:
+            name ( str ): The name of the upstream service.
+            failure_threshold ( int, optional ): The number of consecutive failures that opens the circuit. Defaults to 5.
+            latency_threshold ( Optional[float], optional ): The number of seconds above which a successful call counts as a failure, or None to disable. Defaults to None.
+            reset_timeout ( float, optional ): The number of seconds the circuit stays open before a trial call is allowed. Defaults to 30.0.
+        """
+        self.name = name
+        self.__failure_threshold = failure_threshold
+        self.__latency_threshold = latency_threshold
+        self.__reset_timeout = reset_timeout
+        self.__lock = Lock()
+        self.__state = 'closed'
+        self.__opened_at = 0.0
+        self.__trial_in_flight = False
+        self.__consecutive_failures = 0
+        self.__counters = { 'successes': 0, 'failures': 0, 'rejected': 0, 'opened': 0, 'hedged': 0 }
+
+    def allow_request( self ) -> bool:
+        """Checks whether a call may be sent to the upstream service.
+
+        Returns:
+            bool: True if the call may be sent, False if it must fail fast.
+        """
+        with self.__lock:
+            if self.__state == 'open' and monotonic() - self.__opened_at >= self.__reset_timeout:
+                self.__state = 'half_open'
+
+            if self.__state == 'closed' or ( self.__state == 'half_open' and not self.__trial_in_flight ):
+                self.__trial_in_flight = self.__state == 'half_open'
+                return True
+
+            self.__counters[ 'rejected' ] += 1
+            return False
+
+    def record_success( self, latency: float ):
+        """Records a completed call, counting it as a failure if it exceeded the latency threshold.
+
+        Args:
+            latency ( float ): The duration of the call in seconds.
+        """
+        if self.__latency_threshold is not None and latency > self.__latency_threshold:
+            self.record_failure()
+            return
+
+        with self.__lock:
+            self.__counters[ 'successes' ] += 1
+            self.__consecutive_failures = 0
+            self.__trial_in_flight = False
+            self.__state = 'closed'
+
+    def record_failure( self ):
+        """Records a failed call, opening the circuit if the upstream service is considered unhealthy."""
+        with self.__lock:
+            self.__counters[ 'failures' ] += 1
+            self.__consecutive_failures += 1
+
+            if self.__state == 'half_open' or self.__consecutive_failures >= self.__failure_threshold:
+                if self.__state != 'open':
+                    self.__counters[ 'opened' ] += 1
+                self.__state = 'open'
+                self.__opened_at = monotonic()
+
+            self.__trial_in_flight = False
+
+    def record_hedge( self ):
+        """Records that a hedged duplicate call was sent."""
+        with self.__lock:
+            self.__counters[ 'hedged' ] += 1
+
+    def stats( self ) -> Dict[str, Any]:
+        """Retrieves the state and counters of the circuit.
+
+        Returns:
+            Dict[str, Any]: A dictionary with the circuit state, consecutive failures and call counters.
+        """
+        with self.__lock:
+            return { 'state': self.__state, 'consecutive_failures': self.__consecutive_failures, **self.__counters }
+
+def _send( session: req.Session, breaker: CircuitBreaker, method: str, url: str, timeout: tuple, hedge_delay: Optional[float] = None, executor: Optional[ThreadPoolExecutor] = None, **kwargs ) -> req.Response:
+    """Sends a request through an upstream's circuit breaker.
+
+    Server errors ( 5xx ) are raised as failures. If a hedge delay and executor are given, a duplicate request
+    is sent when the first has not completed within the delay, and the first successful response wins;
+    this must only be used for idempotent requests.
+
+    Args:
+        session ( req.Session ): The session used to send the request.
+        breaker ( CircuitBreaker ): The circuit breaker of the upstream service.
+        method ( str ): The HTTP method.
+        url ( str ): The request URL.
+        timeout ( tuple ): The connect and read timeouts in seconds.
+        hedge_delay ( Optional[float], optional ): The number of seconds to wait before sending a hedged request. Defaults to None.
+        executor ( Optional[ThreadPoolExecutor], optional ): The executor used to send hedged requests. Defaults to None.
+        **kwargs: Additional arguments passed to the session request.
+
+    Raises:
+        req.exceptions.RequestException: If the circuit is open or the request failed.
+
+    Returns:
+        req.Response: The response of the upstream service.
+    """
+    if not breaker.allow_request():
+        error = CircuitOpenError( f'Circuit for { breaker.name } is open' )
+        observe_upstream( breaker.name, None, error )
+        raise error
+
+    if 'json' in kwargs:
+        kwargs[ 'data' ] = _encode_json( kwargs.pop( 'json' ) )
+
+    def attempt() -> req.Response:
+        resp = session.request( method, url, timeout=timeout, **kwargs )
+        if resp.status_code >= 500:
+            raise req.exceptions.HTTPError( f'{ resp.status_code } Server Error for url: { url }', response=resp )
+        return resp
+
+    start = perf_counter()
+
+    if hedge_delay is None or executor is None:
+        try:
+            resp = attempt()
+        except req.exceptions.RequestException as e:
+            breaker.record_failure()
+            observe_upstream( breaker.name, perf_counter() - start, e )
+            raise
+
+        breaker.record_success( perf_counter() - start )
+        observe_upstream( breaker.name, perf_counter() - start )
+        return resp
+
+    futures = [ executor.submit( attempt ) ]
+    if not wait( futures, timeout=hedge_delay ).done:
+        breaker.record_hedge()
+        futures.append( executor.submit( attempt ) )
+
+    error: Exception = req.exceptions.RequestException( f'Request to { url } failed' )
+    for future in as_completed( futures ):
+        try:
+            resp = future.result()
+        except req.exceptions.RequestException as e:
+            error = e
+            continue
+
+        breaker.record_success( perf_counter() - start )
+        observe_upstream( breaker.name, perf_counter() - start )
+        return resp
+
+    breaker.record_failure()
+    observe_upstream( breaker.name, perf_counter() - start, error )
+    raise error
 
 class CameraInterface:
     """Interface for interacting with a camera service.
@@ -7,16 +216,35 @@ class CameraInterface:
     Provides methods for capturing images and retrieving stream URLs.
     """
 
-    def __init__( self, url: str, timeout: int = 10, debug: bool = False ):
+    def __init__( self, url: str, connect_timeout: float = 3.05, read_timeout: float = 10, pool_size: int = 10, retries: int = 2, backoff_factor: float = 0.25, breaker: Optional[CircuitBreaker] = None, hedge_delay: Optional[float] = None, stream_url_ttl: float = 300.0, stream_url_retry_delay: float = 5.0, debug: bool = False ):
         """Initializes the CameraInterface.
 
         Args:
             url ( str ): The base URL of the camera service.
-            timeout ( int, optional ): Request timeout in seconds. Defaults to 10.
+            connect_timeout ( float, optional ): Connection timeout in seconds. Defaults to 3.05.
+            read_timeout ( float, optional ): Read timeout in seconds. Defaults to 10.
+            pool_size ( int, optional ): The number of keep-alive connections to the camera service. Defaults to 10.
+            retries ( int, optional ): The maximum number of retries for idempotent requests. Defaults to 2.
+            backoff_factor ( float, optional ): The backoff factor applied between retries. Defaults to 0.25.
+            breaker ( Optional[CircuitBreaker], optional ): The circuit breaker of the camera service. Defaults to a CircuitBreaker with default settings.
+            hedge_delay ( Optional[float], optional ): The number of seconds after which idempotent requests are hedged, or None to disable hedging. Defaults to None.
+            stream_url_ttl ( float, optional ): The number of seconds the stream URL is cached. Defaults to 300.0.
+            stream_url_retry_delay ( float, optional ): The number of seconds before a failed stream URL refresh is retried. Defaults to 5.0.
             debug ( bool, optional ): Enables debug logging. Defaults to False.
         """
         self.__url = url
-        self.__timeout = timeout
+        self.__timeout = ( connect_timeout, read_timeout )
+        self.__pool_size = pool_size
+        self.__retries = retries
+        self.__backoff_factor = backoff_factor
+        self.__breaker = breaker or CircuitBreaker( 'camera' )
+        self.__hedge_delay = hedge_delay
+        self.reset()
+        self.__stream_url_ttl = stream_url_ttl
+        self.__stream_url_retry_delay = stream_url_retry_delay
+        self.__stream_url: Optional[str] = None
+        self.__stream_url_expires_at = 0.0
+        self.__stream_url_lock = Lock()
         self.__debug = debug
 
     def capture_image( self, payload: dict, headers: Optional[Dict] = None ) -> Optional[Dict[str, Any]]:
@@ -33,7 +261,7 @@ class CameraInterface:
         default_header = { 'Content-type': 'application/json' }
 
         try:
-            resp = req.post( url=f'{ self.__url }/capture', headers=headers or default_header, json=payload, timeout=self.__timeout )
+            resp = _send( self.__session, self.__breaker, 'POST', f'{ self.__url }/capture', self.__timeout, headers=headers or default_header, json=payload )
 
         except req.exceptions.RequestException as e:
             if self.__debug: print( f'Error occurred while capturing image:\n\n{ e }\n\n' )
@@ -42,13 +270,47 @@ class CameraInterface:
         return resp.json()
 
     def get_stream_url( self ) -> Optional[str]:
+        """Retrieves the stream URL, from the cache while it is fresh or from the camera service otherwise.
+
+        A single caller refreshes the URL at a time. While it does, other callers get the stale URL right away, and only
+        wait for the refresh if no URL was cached yet. A failed refresh is retried after the retry delay rather than by
+        every caller, and the last known URL is served meanwhile.
+
+        Returns:
+            Optional[str]: The stream URL, or None if an error occurred and no URL was cached.
+        """
+        if monotonic() < self.__stream_url_expires_at:
+            return self.__stream_url
+
+        if not self.__stream_url_lock.acquire( blocking=self.__stream_url is None ):
+            return self.__stream_url
+
+        try:
+            if monotonic() < self.__stream_url_expires_at:
+                return self.__stream_url
+
+            stream_url = self.__fetch_stream_url()
+
+            if stream_url is None:
+                self.__stream_url_expires_at = monotonic() + self.__stream_url_retry_delay
+                return self.__stream_url
+
+            self.__stream_url = stream_url
+            self.__stream_url_expires_at = monotonic() + self.__stream_url_ttl
+
+        finally:
+            self.__stream_url_lock.release()
+
+        return stream_url
+
+    def __fetch_stream_url( self ) -> Optional[str]:
         """Retrieves the stream URL from the camera service.
 
         Returns:
             Optional[str]: The stream URL, or None if an error occurred.
         """
         try:
-            resp = req.get( url=f'{ self.__url }/stream', timeout=self.__timeout )
+            resp = _send( self.__session, self.__breaker, 'GET', f'{ self.__url }/stream', self.__timeout, hedge_delay=self.__hedge_delay, executor=self.__hedge_executor )
 
         except req.exceptions.RequestException as e:
             if self.__debug: print( f'Error occurred while getting stream URL:\n\n{ e }\n\n' )
@@ -56,22 +318,61 @@ class CameraInterface:
 
         return resp.json().get( 'stream_url' )
 
+    def get_circuit_stats( self ) -> Dict[str, Any]:
+        """Retrieves the circuit breaker state and counters of the camera service.
+
+        Returns:
+            Dict[str, Any]: A dictionary with the circuit state and call counters.
+        """
+        return self.__breaker.stats()
+
+    def reset( self ):
+        """Creates a new session and hedge executor.
+
+        Call this in a forked worker process. The session and executor inherited from the parent are dropped
+        without being closed, since the parent still uses their connections.
+        """
+        self.__session = _create_session( self.__pool_size, self.__retries, self.__backoff_factor )
+        self.__hedge_executor = ThreadPoolExecutor( max_workers=self.__pool_size, thread_name_prefix='camera-hedge' ) if self.__hedge_delay is not None else None
+
+    def shutdown( self, wait: bool = True ):
+        """Stops the hedge executor and closes the session.
+
+        Args:
+            wait ( bool, optional ): Whether to block until in-flight hedged requests have finished. Defaults to True.
+        """
+        if self.__hedge_executor is not None:
+            self.__hedge_executor.shutdown( wait=wait )
+        self.__session.close()
+
 class AnalyzerInterface:
     """Interface for interacting with an image analysis service.
 
     Provides a method for analyzing images.
     """
 
-    def __init__( self, url: str, timeout: int = 10, debug: bool = False ):
+    def __init__( self, url: str, connect_timeout: float = 3.05, read_timeout: float = 10, pool_size: int = 10, retries: int = 2, backoff_factor: float = 0.25, max_concurrency: int = 8, breaker: Optional[CircuitBreaker] = None, debug: bool = False ):
         """Initializes the AnalyzerInterface.
 
         Args:
             url ( str ): The URL of the image analysis service.
-            timeout ( int, optional ): Request timeout in seconds. Defaults to 10.
+            connect_timeout ( float, optional ): Connection timeout in seconds. Defaults to 3.05.
+            read_timeout ( float, optional ): Read timeout in seconds. Defaults to 10.
+            pool_size ( int, optional ): The number of keep-alive connections to the image analysis service. Defaults to 10.
+            retries ( int, optional ): The maximum number of retries for idempotent requests. Defaults to 2.
+            backoff_factor ( float, optional ): The backoff factor applied between retries. Defaults to 0.25.
+            max_concurrency ( int, optional ): The maximum number of concurrent requests made by analyze_images. Defaults to 8.
+            breaker ( Optional[CircuitBreaker], optional ): The circuit breaker of the analysis service. Defaults to a CircuitBreaker with default settings.
             debug ( bool, optional ): Enables debug logging. Defaults to False.
         """
         self.__url = url
-        self.__timeout = timeout
+        self.__timeout = ( connect_timeout, read_timeout )
+        self.__pool_size = max( pool_size, max_concurrency )
+        self.__retries = retries
+        self.__backoff_factor = backoff_factor
+        self.__max_concurrency = max_concurrency
+        self.__breaker = breaker or CircuitBreaker( 'analyzer' )
+        self.reset()
         self.__debug = debug
 
     def analyze_image( self, payload: dict, headers: Optional[Dict] = None ) -> Optional[Dict[str, Any]]:
@@ -88,10 +389,101 @@ class AnalyzerInterface:
         default_header = { 'Content-type': 'application/json' }
 
         try:
-            resp = req.post( url=self.__url, headers=headers or default_header, json=payload, timeout=self.__timeout )
+            resp = _send( self.__session, self.__breaker, 'POST', self.__url, self.__timeout, headers=headers or default_header, json=payload )
+            return resp.json()
 
-        except req.exceptions.RequestException as e:
+        # A reply that is not JSON only fails this image, since analyze_images collects every result of a batch
+        except ( req.exceptions.RequestException, ValueError ) as e:
             if self.__debug: print( f'Error occurred while analyzing image:\n\n{ e }\n\n' )
             return None
 
-        return resp.json()
+    def analyze_images( self, payloads: List[dict], headers: Optional[Dict] = None ) -> List[Optional[Dict[str, Any]]]:
+        """Analyzes many images concurrently using the analysis service.
+
+        At most max_concurrency requests are in flight at once, shared across all callers.
+
+        Args:
+            payloads ( List[dict] ): The request payloads, one per image.
+            headers ( Optional[Dict], optional ): Request headers. Defaults to None.
+
+        Returns:
+            List[Optional[Dict[str, Any]]]: The JSON responses in the order of the payloads, with None for each image that could not be analyzed.
+        """
+        return list( self.__executor.map( lambda payload: self.analyze_image( payload, headers ), payloads ) )
+
+    def get_circuit_stats( self ) -> Dict[str, Any]:
+        """Retrieves the circuit breaker state and counters of the analysis service.
+
+        Returns:
+            Dict[str, Any]: A dictionary with the circuit state and call counters.
+        """
+        return self.__breaker.stats()
+
+    def reset( self ):
+        """Creates a new session and executor.
+
+        Call this in a forked worker process. The session and executor inherited from the parent are dropped
+        without being closed, since the parent still uses their connections.
+        """
+        self.__session = _create_session( self.__pool_size, self.__retries, self.__backoff_factor )
+        self.__executor = ThreadPoolExecutor( max_workers=self.__max_concurrency, thread_name_prefix='analyzer' )
+
+    def shutdown( self, wait: bool = True ):
+        """Stops the executor and closes the session.
+
+        Args:
+            wait ( bool, optional ): Whether to block until in-flight analyses have finished. Defaults to True.
+        """
+        self.__executor.shutdown( wait=wait )
+        self.__session.close()
+
+class CallbackInterface:
+    """Interface for notifying client webhooks.
+
+    Provides a method for posting job results to a callback URL.
+    """
+
+    def __init__( self, connect_timeout: float = 3.05, read_timeout: float = 10, pool_size: int = 10, debug: bool = False ):
+        """Initializes the CallbackInterface.
+
+        Args:
+            connect_timeout ( float, optional ): Connection timeout in seconds. Defaults to 3.05.
+            read_timeout ( float, optional ): Read timeout in seconds. Defaults to 10.
+            pool_size ( int, optional ): The number of keep-alive connections per callback host. Defaults to 10.
+            debug ( bool, optional ): Enables debug logging. Defaults to False.
+        """
+        self.__timeout = ( connect_timeout, read_timeout )
+        self.__pool_size = pool_size
+        self.__debug = debug
+        self.reset()
+
+    def notify( self, url: str, payload: dict ) -> bool:
+        """Posts a payload to a callback URL.
+
+        Args:
+            url ( str ): The callback URL.
+            payload ( dict ): The JSON payload to post.
+
+        Returns:
+            bool: True if the callback accepted the payload, False otherwise.
+        """
+        try:
+            resp = self.__session.post( url=url, data=_encode_json( payload ), headers={ 'Content-type': 'application/json' }, timeout=self.__timeout, allow_redirects=False )
+
+        except req.exceptions.RequestException as e:
+            if self.__debug: print( f'Error occurred while notifying callback:\n\n{ e }\n\n' )
+            return False
+
+        return resp.ok
+
+    def reset( self ):
+        """Creates a new session.
+
+        Call this in a forked worker process. The session inherited from the parent is dropped without being closed,
+        since the parent still uses its connections.
+        """
+        self.__session = _create_session( self.__pool_size, 0, 0 )
+
+    def shutdown( self ):
+        """Closes the session."""
+        self.__session.close()
@@ -0,0 +1,108 @@
+from argparse import ArgumentParser
+from contextlib import redirect_stdout
+from tempfile import TemporaryDirectory
+from typing import Dict, List, Optional, Any, cast
+from uuid import UUID
+import json
+import os
+import random
+import secrets
+import sqlalchemy as sa
+from sqlalchemy.orm import Session
+from marshmallow import EXCLUDE
+import sys
+sys.path.insert(0, r'./src/')
+sys.path.insert(0, r'./test/')
+from models import _Base, PatientsModel
+from db_handler import DBhandler
+from registry import TABLES
+from seed_database import generate_batches, seed_database
+from benchmark_utils import time_call, run_metadata
+
+def create_entry_then_select( engine: sa.Engine, data: dict ) -> Optional[Dict[str, Any]]:
+    """Creates a patient the way DBhandler.create_entry did before it used INSERT ... RETURNING.
+
+    The entry is committed through an ORM session and then read back with a separate SELECT, which is the round trip
+    that RETURNING saves.
+
+    Args:
+        engine ( sa.Engine ): The database engine.
+        data ( dict ): A dictionary containing the data for the new patient.
+
+    Returns:
+        Optional[Dict[str, Any]]: A dictionary representing the created patient.
+    """
+    new_entry = PatientsModel( **data, id=str( UUID( hex=secrets.token_hex( 16 ) ) ) )
+
+    with Session( engine ) as conn:
+        conn.add( new_entry )
+        conn.commit()
+        result = conn.execute( sa.select( PatientsModel ).where( PatientsModel.id == new_entry.id ) ).fetchone()
+
+    return result._asdict() if result else None
+
+def benchmark_size( num_patients: int, repeat: int, seed: int ) -> Dict[str, Any]:
+    """Runs the DBhandler and schema microbenchmarks against a freshly seeded SQLite database.
+
+    Args:
+        num_patients ( int ): The number of patients seeded, with about 20 images and 20 assessments each.
+        repeat ( int ): The number of timed calls of the cheap operations. Full table reads are timed a tenth as often.
+        seed ( int ): The random seed.
+
+    Returns:
+        Dict[str, Any]: The row counts and the latency percentiles of each operation.
+    """
+    with TemporaryDirectory() as tmp:
+        db_uri = f'sqlite:///{ tmp }/benchmark.db'
+        engine = sa.create_engine( db_uri )
+        _Base.metadata.create_all( engine )
+        counts = seed_database( engine, generate_batches( num_patients, 5000, 2, 10, 1, 0.1, seed ), truncate=False )
+
+        with engine.connect() as conn:
+            patient_ids = list( conn.execute( sa.select( PatientsModel.id ) ).scalars() )
+
+        rng = random.Random( seed )
+        cached = DBhandler( db_uri, debug=False )
+        uncached = DBhandler( db_uri, debug=False, cache_size=0 )
+        slow_repeat = max( 1, repeat // 10 )
+
+        images = cached.get_all_entries( table_name='images' )
+        image_schema = TABLES[ 'images' ].schema
+        patient_schema = TABLES[ 'patients' ].schema
+        dumped_images = cast( List[Dict[str, Any]], image_schema.dump( images, many=True ) )
+        new_patients = [ { 'first_name': 'Bench', 'last_name': f'Mark{ i }' } for i in range( 1000 ) ]
+
+        results = {
+            'create_entry': time_call( lambda: cached.create_entry( data={ 'first_name': 'Bench', 'last_name': 'Mark' }, table_name='patients' ), repeat ),
+            'create_entry_then_select': time_call( lambda: create_entry_then_select( engine, { 'first_name': 'Bench', 'last_name': 'Mark' } ), repeat ),
+            'get_entry_from_id_uncached': time_call( lambda: uncached.get_entry_from_id( uuid=rng.choice( patient_ids ), table_name='patients' ), repeat ),
+            'get_entry_from_id_cached': time_call( lambda: cached.get_entry_from_id( uuid=patient_ids[ 0 ], table_name='patients' ), repeat ),
+            'get_all_entries_patients': time_call( lambda: cached.get_all_entries( table_name='patients' ), slow_repeat ),
+            'get_all_entries_images': time_call( lambda: cached.get_all_entries( table_name='images' ), slow_repeat ),
+            'get_entries_page_images': time_call( lambda: cached.get_entries_page( table_name='images', limit=100 ), repeat ),
+            'dump_images': time_call( lambda: image_schema.dump( images, many=True ), slow_repeat ),
+            'load_images': time_call( lambda: TABLES[ 'images' ].import_schema.load( dumped_images, many=True, unknown=EXCLUDE ), slow_repeat ),
+            'load_1000_patients': time_call( lambda: patient_schema.load( new_patients, many=True ), repeat )
+        }
+        engine.dispose()
+
+    return { 'rows': counts, 'results': results }
+
+if __name__ == '__main__':
+    parser = ArgumentParser( description='Microbenchmarks DBhandler operations and schema dump/load at several table sizes.' )
+    parser.add_argument( '--sizes', type=lambda s: [ int( n ) for n in s.split( ',' ) ], default=[ 1000, 10000 ], help='Comma separated numbers of patients to seed, one database per size.' )
+    parser.add_argument( '--repeat', type=int, default=200, help='Number of timed calls per operation.' )
+    parser.add_argument( '--seed', type=int, default=0, help='Random seed.' )
+    parser.add_argument( '--output', default=None, help='File to write the results to, in addition to stdout.' )
+    args = parser.parse_args()
+
+    # DBhandler prints every fetched entry, so its output is discarded while timing
+    with open( os.devnull, 'w' ) as devnull, redirect_stdout( devnull ):
+        sizes = { str( n ): benchmark_size( n, args.repeat, args.seed ) for n in args.sizes }
+
+    report = json.dumps( { 'run': run_metadata( vars( args ) ), 'sizes': sizes }, indent=4 )
+    print( report )
+
+    if args.output:
+        with open( args.output, 'w' ) as f:
+            f.write( report )
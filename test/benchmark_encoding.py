@@ -0,0 +1,67 @@
+from argparse import ArgumentParser
+from contextlib import redirect_stdout
+from tempfile import TemporaryDirectory
+import json
+import os
+import sqlalchemy as sa
+import sys
+sys.path.insert(0, r'./src/')
+sys.path.insert(0, r'./test/')
+from models import _Base
+from seed_database import generate_batches, seed_database
+from benchmark_utils import time_call, run_metadata
+
+TABLES = ( 'patients', 'image_sets', 'images', 'assessments' )
+ENCODINGS = ( 'identity', 'gzip', 'br' )
+
+if __name__ == '__main__':
+    parser = ArgumentParser( description='Benchmarks JSON encoding time and bytes on the wire of the table listings.' )
+    parser.add_argument( '--patients', type=int, default=2000, help='Number of patients. The default yields about 40k images and 40k assessments.' )
+    parser.add_argument( '--repeat', type=int, default=10, help='Number of timed runs per measurement.' )
+    parser.add_argument( '--seed', type=int, default=0, help='Random seed.' )
+    parser.add_argument( '--output', default=None, help='File to write the results to, in addition to stdout.' )
+    args = parser.parse_args()
+
+    # The app prints every fetched entry, so its output is discarded during the run
+    with open( os.devnull, 'w' ) as devnull, redirect_stdout( devnull ), TemporaryDirectory() as tmp:
+        db_uri = f'sqlite:///{ tmp }/benchmark.db'
+        engine = sa.create_engine( db_uri )
+        _Base.metadata.create_all( engine )
+        counts = seed_database( engine, generate_batches( args.patients, 5000, 2, 10, 1, 0.1, args.seed ), truncate=False )
+        engine.dispose()
+
+        os.environ[ 'DB_URI' ] = db_uri
+        os.environ[ 'COMPRESSION' ] = '1'
+        from flask.json.provider import DefaultJSONProvider
+        import app as api
+
+        client = api.app.test_client()
+        stdlib_provider = DefaultJSONProvider( api.app )
+        results = {}
+
+        for table_name in TABLES:
+            with api.app.test_request_context( f'/{ table_name }' ):
+                entries = api.db.get_all_entries( table_name=table_name )
+                dumped = api.get_table_entries( table_name ).get_json()
+
+                results[ table_name ] = {
+                    'rows': len( entries or [] ),
+                    'encode': {
+                        'stdlib': time_call( lambda: stdlib_provider.response( dumped ), args.repeat ),
+                        'orjson': time_call( lambda: api.app.json.response( dumped ), args.repeat )
+                    },
+                    'wire_bytes': {},
+                    'request': {}
+                }
+
+            for encoding in ENCODINGS:
+                response = client.get( f'/{ table_name }', headers={ 'Accept-Encoding': encoding } )
+                results[ table_name ][ 'wire_bytes' ][ encoding ] = len( response.data )
+                results[ table_name ][ 'request' ][ encoding ] = time_call( lambda: client.get( f'/{ table_name }', headers={ 'Accept-Encoding': encoding } ), args.repeat )
+
+    report = json.dumps( { 'run': run_metadata( vars( args ) ), 'rows': counts, 'results': results }, indent=4 )
+    print( report )
+
+    if args.output:
+        with open( args.output, 'w' ) as f:
+            f.write( report )
@@ -0,0 +1,85 @@
+from argparse import ArgumentParser
+from contextlib import redirect_stdout
+from datetime import datetime
+from tempfile import TemporaryDirectory
+from time import perf_counter
+from typing import Dict, List, Any
+import json
+import sqlalchemy as sa
+import sys
+sys.path.insert(0, r'./src/')
+sys.path.insert(0, r'./test/')
+from models import _Base, ImageSetsModel, ImagesModel, AssessmentsModel
+from migrations import run_migrations
+from seed_database import generate_batches, seed_database
+from benchmark_utils import percentiles, run_metadata
+
+QUERIES: Dict[str, Any] = {
+    'image_sets_by_patient': lambda p, s: sa.select( ImageSetsModel ).where( ImageSetsModel.patient_id == p ),
+    'images_by_set': lambda p, s: sa.select( ImagesModel ).where( ImagesModel.set_id == s ),
+    'images_by_patient_ordered': lambda p, s: sa.select( ImagesModel ).where( ImagesModel.patient_id == p ).order_by( ImagesModel.image_timestamp ),
+    'assessments_by_patient_in_range': lambda p, s: sa.select( AssessmentsModel ).where(
+        AssessmentsModel.patient_id == p,
+        AssessmentsModel.assessment_timestamp >= datetime( 2018, 1, 1 ),
+        AssessmentsModel.assessment_timestamp < datetime( 2021, 1, 1 )
+    )
+}
+
+def time_queries( engine: sa.Engine, samples: List[ tuple ] ) -> Dict[str, Dict[str, float]]:
+    """Times every benchmark query for each sampled patient and image set.
+
+    Args:
+        engine ( sa.Engine ): The database engine.
+        samples ( List[tuple] ): The sampled ( patient_id, set_id ) pairs.
+
+    Returns:
+        Dict[str, Dict[str, float]]: The p50, p95 and p99 latency in milliseconds of each query.
+    """
+    results = {}
+
+    with engine.connect() as conn:
+        for name, build_query in QUERIES.items():
+            latencies = []
+            for patient_id, set_id in samples:
+                start = perf_counter()
+                conn.execute( build_query( patient_id, set_id ) ).fetchall()
+                latencies.append( perf_counter() - start )
+
+            results[ name ] = percentiles( latencies )
+
+    return results
+
+if __name__ == '__main__':
+    parser = ArgumentParser( description='Benchmarks patient-scoped query latency with and without the lookup indexes.' )
+    parser.add_argument( '--patients', type=int, default=50000, help='Number of patients. The default yields about 1M images and 1M assessments.' )
+    parser.add_argument( '--queries', type=int, default=50, help='Number of sampled patients queried per benchmark query.' )
+    parser.add_argument( '--seed', type=int, default=0, help='Random seed.' )
+    parser.add_argument( '--output', default=None, help='File to write the results to, in addition to stdout.' )
+    args = parser.parse_args()
+
+    # Seeding and migration progress goes to stderr, so that stdout only carries the report
+    with redirect_stdout( sys.stderr ):
+        with TemporaryDirectory() as tmp:
+            engine = sa.create_engine( f'sqlite:///{ tmp }/benchmark.db' )
+            _Base.metadata.create_all( engine )
+
+            with engine.begin() as conn:
+                for table in _Base.metadata.sorted_tables:
+                    for index in table.indexes:
+                        index.drop( conn )
+
+            counts = seed_database( engine, generate_batches( args.patients, 5000, 2, 10, 1, 0.1, args.seed ), truncate=False )
+
+            with engine.connect() as conn:
+                samples = [ tuple( r ) for r in conn.execute( sa.select( ImageSetsModel.patient_id, ImageSetsModel.id ).order_by( sa.func.random() ).limit( args.queries ) ) ]
+
+            without_indexes = time_queries( engine, samples )
+            run_migrations( engine )
+            with_indexes = time_queries( engine, samples )
+
+    report = json.dumps( { 'run': run_metadata( vars( args ) ), 'rows': counts, 'without_indexes': without_indexes, 'with_indexes': with_indexes }, indent=4 )
+    print( report )
+
+    if args.output:
+        with open( args.output, 'w' ) as f:
+            f.write( report )
@@ -0,0 +1,66 @@
+from argparse import ArgumentParser
+from typing import Any
+import json
+import sys
+sys.path.insert(0, r'./src/')
+sys.path.insert(0, r'./test/')
+from schemas import ImageSetsSchema, PatientsSchema, ImagesSchema, AssessmentsSchema
+from registry import TABLES
+from seed_database import generate_batches, to_rows
+from benchmark_utils import time_call, run_metadata
+
+SCHEMA_CLASSES = {
+    'patients': PatientsSchema,
+    'image_sets': ImageSetsSchema,
+    'images': ImagesSchema,
+    'assessments': AssessmentsSchema
+}
+
+def per_request_schemas( table_name: str, many: bool ) -> Any:
+    """Builds the schemas of a request like the routes did before the registry: a default schema, then the table's schema.
+
+    Args:
+        table_name ( str ): The name of the table.
+        many ( bool ): Whether the schema dumps a list of entries.
+
+    Returns:
+        Any: The table's schema.
+    """
+    PatientsSchema( many=many )
+    return SCHEMA_CLASSES[ table_name ]( many=many )
+
+if __name__ == '__main__':
+    parser = ArgumentParser( description='Benchmarks the per-request serialization overhead of building schemas versus the schema registry.' )
+    parser.add_argument( '--page-size', type=int, default=100, help='Number of entries dumped per listing request.' )
+    parser.add_argument( '--repeat', type=int, default=2000, help='Number of timed requests per measurement.' )
+    parser.add_argument( '--output', default=None, help='File to write the results to, in addition to stdout.' )
+    args = parser.parse_args()
+
+    batch = next( generate_batches( args.page_size, args.page_size, 2, 10, 1, 0.1, 0 ) )
+    results = {}
+
+    for table_name in TABLES:
+        rows = to_rows( batch[ table_name ] )[ :args.page_size ]
+        table = TABLES[ table_name ]
+
+        results[ table_name ] = {
+            'entry': {
+                'before': time_call( lambda: per_request_schemas( table_name, False ).dump( rows[ 0 ] ), args.repeat, unit='us' ),
+                'after': time_call( lambda: table.schema.dump( rows[ 0 ] ), args.repeat, unit='us' )
+            },
+            'listing': {
+                'before': time_call( lambda: per_request_schemas( table_name, True ).dump( rows ), args.repeat, unit='us' ),
+                'after': time_call( lambda: table.schema.dump( rows, many=True ), args.repeat, unit='us' )
+            },
+            'schema_build_only': {
+                'before': time_call( lambda: per_request_schemas( table_name, False ), args.repeat, unit='us' ),
+                'after': time_call( lambda: TABLES[ table_name ].schema, args.repeat, unit='us' )
+            }
+        }
+
+    report = json.dumps( { 'run': run_metadata( vars( args ) ), 'page_size': args.page_size, 'results': results }, indent=4 )
+    print( report )
+
+    if args.output:
+        with open( args.output, 'w' ) as f:
+            f.write( report )
@@ -0,0 +1,133 @@
+from argparse import ArgumentParser
+from threading import Thread, Lock
+from time import perf_counter
+from typing import Dict, List, Callable, Any
+import json
+import requests as req
+import sys
+sys.path.insert(0, r'./src/')
+sys.path.insert(0, r'./test/')
+from webhook_handler import CameraInterface, AnalyzerInterface
+from fake_upstreams import FakeUpstream
+from benchmark_utils import time_call, summarize_load, run_metadata
+
+#* NOTE: The per-call variants send each request with requests.post and a fresh connection, as the interfaces did
+#* NOTE: before they held a pooled keep-alive session.
+
+HEADERS = { 'Content-type': 'application/json' }
+
+def run_concurrent( func: Callable[[], Any], concurrency: int, calls: int ) -> Dict[str, Any]:
+    """Calls a function from several threads at once.
+
+    Args:
+        func ( Callable[[], Any] ): The function sending one request. It returns None if the request failed.
+        concurrency ( int ): The number of threads.
+        calls ( int ): The number of calls per thread.
+
+    Returns:
+        Dict[str, Any]: The request and error counts, the throughput and the latency percentiles.
+    """
+    latencies: List[float] = []
+    errors = 0
+    lock = Lock()
+
+    def worker():
+        nonlocal errors
+        local_latencies = []
+        local_errors = 0
+
+        for _ in range( calls ):
+            start = perf_counter()
+            local_errors += func() is None
+            local_latencies.append( perf_counter() - start )
+
+        with lock:
+            latencies.extend( local_latencies )
+            errors += local_errors
+
+    start = perf_counter()
+    threads = [ Thread( target=worker ) for _ in range( concurrency ) ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    return summarize_load( latencies, errors, perf_counter() - start )
+
+def per_call_post( url: str, payload: dict, timeout: float ) -> Any:
+    """Sends a request without a session, opening a new connection.
+
+    Args:
+        url ( str ): The URL to post to.
+        payload ( dict ): The JSON payload.
+        timeout ( float ): The request timeout in seconds.
+
+    Returns:
+        Any: The JSON response, or None if the request failed.
+    """
+    try:
+        resp = req.post( url=url, headers=HEADERS, json=payload, timeout=timeout )
+        resp.raise_for_status()
+    except req.exceptions.RequestException:
+        return None
+
+    return resp.json()
+
+def run_benchmark( args: Any ) -> Dict[str, Any]:
+    """Times camera and analyzer calls through the pooled interfaces and with per-call requests.
+
+    Args:
+        args ( Any ): The parsed command line arguments.
+
+    Returns:
+        Dict[str, Any]: The latency percentiles of sequential calls and the load summary of concurrent calls, per variant.
+    """
+    latency = args.latency_ms / 1000
+    camera_upstream = FakeUpstream( 'camera', latency, seed=args.seed )
+    analyzer_upstream = FakeUpstream( 'analyzer', latency, seed=args.seed )
+    camera_url = camera_upstream.start()
+    analyzer_url = analyzer_upstream.start()
+
+    camera = CameraInterface( camera_url, pool_size=args.concurrency )
+    analyzer = AnalyzerInterface( analyzer_url, pool_size=args.concurrency, max_concurrency=args.concurrency )
+    payload = { 'image_id': '00000000-0000-0000-0000-000000000000', 'uri': 'https://images.example.com/benchmark.png' }
+
+    variants = {
+        'camera_capture_pooled': lambda: camera.capture_image( {} ),
+        'camera_capture_per_call': lambda: per_call_post( f'{ camera_url }/capture', {}, 10 ),
+        'analyzer_pooled': lambda: analyzer.analyze_image( payload ),
+        'analyzer_per_call': lambda: per_call_post( analyzer_url, payload, 10 )
+    }
+
+    results = {}
+    try:
+        for name, func in variants.items():
+            func()
+            results[ name ] = {
+                'sequential': time_call( func, args.repeat ),
+                'concurrent': run_concurrent( func, args.concurrency, args.repeat // args.concurrency or 1 )
+            }
+            print( f'{ name }: { results[ name ] }', file=sys.stderr )
+    finally:
+        camera.shutdown()
+        analyzer.shutdown()
+        camera_upstream.stop()
+        analyzer_upstream.stop()
+
+    return results
+
+if __name__ == '__main__':
+    parser = ArgumentParser( description='Compares pooled keep-alive sessions with per-call requests against the fake camera and analyzer services.' )
+    parser.add_argument( '--repeat', type=int, default=500, help='Number of timed calls per variant, split across the threads in the concurrent run.' )
+    parser.add_argument( '--concurrency', type=int, default=8, help='Number of threads in the concurrent run, and the pool size of the interfaces.' )
+    parser.add_argument( '--latency-ms', type=float, default=0, help='Latency of the fake upstreams in milliseconds.' )
+    parser.add_argument( '--seed', type=int, default=0, help='Random seed.' )
+    parser.add_argument( '--output', default=None, help='File to write the results to, in addition to stdout.' )
+    args = parser.parse_args()
+
+    report = json.dumps( { 'run': run_metadata( vars( args ) ), 'results': run_benchmark( args ) }, indent=4 )
+    print( report )
+
+    if args.output:
+        with open( args.output, 'w' ) as f:
+            f.write( report )
@@ -0,0 +1,83 @@
+from datetime import datetime, timezone
+from time import perf_counter
+from typing import Dict, List, Callable, Any, Optional
+import platform
+import subprocess
+import numpy as np
+
+UNIT_SCALES = { 's': 1, 'ms': 1e3, 'us': 1e6 }
+
+def percentiles( latencies: List[float], unit: str = 'ms' ) -> Dict[str, Optional[float]]:
+    """Summarizes latencies as percentiles.
+
+    Args:
+        latencies ( List[float] ): The latencies in seconds.
+        unit ( str, optional ): The unit of the percentiles: 's', 'ms' or 'us'. Defaults to 'ms'.
+
+    Returns:
+        Dict[str, Optional[float]]: The p50, p95 and p99 latency, keyed with the unit as suffix, or None without latencies.
+    """
+    if not latencies:
+        return { f'p50_{ unit }': None, f'p95_{ unit }': None, f'p99_{ unit }': None }
+
+    p50, p95, p99 = np.percentile( latencies, [ 50, 95, 99 ] ) * UNIT_SCALES[ unit ]
+    return { f'p50_{ unit }': round( float( p50 ), 3 ), f'p95_{ unit }': round( float( p95 ), 3 ), f'p99_{ unit }': round( float( p99 ), 3 ) }
+
+def time_call( func: Callable[[], Any], repeat: int, unit: str = 'ms' ) -> Dict[str, Optional[float]]:
+    """Times repeated calls of a function.
+
+    Args:
+        func ( Callable[[], Any] ): The function to call.
+        repeat ( int ): The number of calls.
+        unit ( str, optional ): The unit of the percentiles: 's', 'ms' or 'us'. Defaults to 'ms'.
+
+    Returns:
+        Dict[str, Optional[float]]: The p50, p95 and p99 latency.
+    """
+    latencies = []
+    for _ in range( repeat ):
+        start = perf_counter()
+        func()
+        latencies.append( perf_counter() - start )
+
+    return percentiles( latencies, unit )
+
+def summarize_load( latencies: List[float], errors: int, duration: float ) -> Dict[str, Any]:
+    """Summarizes the requests of a load test scenario.
+
+    Args:
+        latencies ( List[float] ): The latencies in seconds of all requests, including failed ones.
+        errors ( int ): The number of failed requests.
+        duration ( float ): The wall clock duration of the scenario in seconds.
+
+    Returns:
+        Dict[str, Any]: The request and error counts, the throughput and the latency percentiles in milliseconds.
+    """
+    return {
+        'requests': len( latencies ),
+        'errors': errors,
+        'req_per_s': round( len( latencies ) / duration, 1 ) if duration > 0 else None,
+        **percentiles( latencies )
+    }
+
+def run_metadata( args: Optional[Dict[str, Any]] = None ) -> Dict[str, Any]:
+    """Describes a benchmark run so that results can be compared across runs.
+
+    Args:
+        args ( Optional[Dict[str, Any]], optional ): The benchmark arguments. Defaults to None.
+
+    Returns:
+        Dict[str, Any]: The commit, time, Python version, platform and arguments of the run.
+    """
+    try:
+        commit = subprocess.run( [ 'git', 'rev-parse', '--short', 'HEAD' ], capture_output=True, text=True, check=True ).stdout.strip()
+    except ( OSError, subprocess.CalledProcessError ):
+        commit = None
+
+    return {
+        'commit': commit,
+        'timestamp': datetime.now( timezone.utc ).isoformat(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'args': args or {}
+    }
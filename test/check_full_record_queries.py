@@ -0,0 +1,91 @@
+from argparse import ArgumentParser
+from contextlib import redirect_stdout
+from tempfile import TemporaryDirectory
+from typing import Dict, List, Any
+import json
+import os
+import sqlalchemy as sa
+import sys
+sys.path.insert(0, r'./src/')
+sys.path.insert(0, r'./test/')
+from models import _Base, ImagesModel
+from seed_database import generate_batches, seed_database
+
+#* NOTE: The full record of a patient is fetched with one query per table, so the number of statements must not grow
+#* NOTE: with the amount of data the patient has. Run from the repository root; exits with an error if the count differs.
+
+EXPECTED_QUERIES = 4
+
+def count_queries( client: Any, patient_id: str ) -> int:
+    """Counts the statements executed while serving a patient's full record.
+
+    Args:
+        client ( Any ): The Flask test client.
+        patient_id ( str ): The ID of the patient.
+
+    Returns:
+        int: The number of statements sent to the database.
+    """
+    statements: List[str] = []
+
+    def record( conn, cursor, statement, parameters, context, executemany ):
+        statements.append( statement )
+
+    sa.event.listen( sa.Engine, 'before_cursor_execute', record )
+    try:
+        response = client.get( f'/patients/{ patient_id }/full' )
+    finally:
+        sa.event.remove( sa.Engine, 'before_cursor_execute', record )
+
+    assert response.status_code == 200, f'GET /patients/{ patient_id }/full returned { response.status_code }'
+
+    return len( statements )
+
+def run_check( args: Any ) -> Dict[str, Any]:
+    """Seeds patients with few and with many images and counts the queries of their full records.
+
+    Args:
+        args ( Any ): The parsed command line arguments.
+
+    Returns:
+        Dict[str, Any]: The number of images and of queries of each checked patient, keyed by volume.
+    """
+    with TemporaryDirectory() as tmp:
+        db_uri = f'sqlite:///{ tmp }/full_record.db'
+        engine = sa.create_engine( db_uri )
+        _Base.metadata.create_all( engine )
+        seed_database( engine, generate_batches( args.patients, 1000, 1, 1, 1, 0.1, args.seed ), truncate=False )
+        seed_database( engine, generate_batches( args.patients, 1000, args.large_sets, args.large_images, 2, 0.1, args.seed + 1 ), truncate=False )
+
+        with engine.connect() as conn:
+            image_counts = conn.execute(
+                sa.select( ImagesModel.patient_id, sa.func.count() ).group_by( ImagesModel.patient_id ).order_by( sa.func.count() )
+            ).all()
+        engine.dispose()
+
+        os.environ[ 'DB_URI' ] = db_uri
+        from app import app
+        client = app.test_client()
+
+        results = {}
+        for volume, ( patient_id, images ) in { 'small': image_counts[ 0 ], 'large': image_counts[ -1 ] }.items():
+            results[ volume ] = { 'images': images, 'queries': count_queries( client, str( patient_id ) ) }
+
+    return results
+
+if __name__ == '__main__':
+    parser = ArgumentParser( description='Checks that a full patient record is fetched with a constant number of queries.' )
+    parser.add_argument( '--patients', type=int, default=50, help='Number of patients to seed for each data volume.' )
+    parser.add_argument( '--large-sets', type=float, default=20, help='Mean number of image sets of the large patients.' )
+    parser.add_argument( '--large-images', type=float, default=50, help='Mean number of images per set of the large patients.' )
+    parser.add_argument( '--seed', type=int, default=0, help='Random seed.' )
+    args = parser.parse_args()
+
+    # The app prints every fetched entry, so its output is discarded during the run
+    with open( os.devnull, 'w' ) as devnull, redirect_stdout( devnull ):
+        results = run_check( args )
+
+    print( json.dumps( results, indent=4 ) )
+
+    for volume, result in results.items():
+        assert result[ 'queries' ] == EXPECTED_QUERIES, f'{ volume } patient: expected { EXPECTED_QUERIES } queries, got { result[ "queries" ] }'
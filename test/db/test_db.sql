@@ -1,7 +1,7 @@
 DROP TABLE IF EXISTS patients;
 CREATE TABLE patients (
 
-    id TEXT NOT NULL PRIMARY KEY,
+    id BLOB NOT NULL PRIMARY KEY,
     first_name TEXT NOT NULL,
     last_name TEXT NOT NULL
 
@@ -11,19 +11,21 @@ CREATE TABLE patients (
 DROP TABLE IF EXISTS image_sets;
 CREATE TABLE image_sets (
     
-    id TEXT NOT NULL PRIMARY KEY,
-    patient_id TEXT NOT NULL,
+    id BLOB NOT NULL PRIMARY KEY,
+    patient_id BLOB NOT NULL,
     
     FOREIGN KEY (patient_id) REFERENCES patients(id)
 
 );
 
+CREATE INDEX ix_image_sets_patient_id ON image_sets (patient_id);
+
 DROP TABLE IF EXISTS images;
 CREATE TABLE images (
 
-    id TEXT NOT NULL PRIMARY KEY,
-    set_id TEXT NOT NULL,
-    patient_id TEXT NOT NULL,
+    id BLOB NOT NULL PRIMARY KEY,
+    set_id BLOB NOT NULL,
+    patient_id BLOB NOT NULL,
     image_timestamp TEXT NOT NULL,
     uri TEXT NOT NULL UNIQUE,
 
@@ -32,13 +34,16 @@ CREATE TABLE images (
 
 );
 
+CREATE INDEX ix_images_set_id ON images (set_id);
+CREATE INDEX ix_images_patient_id_image_timestamp ON images (patient_id, image_timestamp);
+
 DROP TABLE IF EXISTS assessments;
 CREATE TABLE assessments (
 
-    id TEXT NOT NULL PRIMARY KEY,
-    image_id TEXT NOT NULL,
-    set_id TEXT NOT NULL,
-    patient_id TEXT NOT NULL,
+    id BLOB NOT NULL PRIMARY KEY,
+    image_id BLOB NOT NULL,
+    set_id BLOB NOT NULL,
+    patient_id BLOB NOT NULL,
     assessment_timestamp TEXT NOT NULL,
     assessment BOOLEAN NOT NULL CHECK ( assessment IN (0, 1) ),
 
@@ -46,3 +51,21 @@ CREATE TABLE assessments (
     FOREIGN KEY (set_id) REFERENCES image_sets(id)
 
 );
+
+CREATE INDEX ix_assessments_image_id ON assessments (image_id);
+CREATE INDEX ix_assessments_set_id ON assessments (set_id);
+CREATE INDEX ix_assessments_patient_id_assessment_timestamp ON assessments (patient_id, assessment_timestamp);
+
+DROP TABLE IF EXISTS jobs;
+CREATE TABLE jobs (
+
+    id BLOB NOT NULL PRIMARY KEY,
+    kind TEXT NOT NULL,
+    status TEXT NOT NULL,
+    result TEXT,
+    error TEXT,
+    callback_url TEXT,
+    created_at TEXT NOT NULL,
+    updated_at TEXT NOT NULL
+
+);
@@ -0,0 +1,162 @@
+from argparse import ArgumentParser
+from datetime import datetime, timezone
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from threading import Thread, Lock
+from time import sleep
+from typing import Optional, List, Tuple, Dict, Any
+from uuid import uuid4
+import json
+import random
+
+class FakeUpstream:
+    """Local stand-in for the camera or analyzer service that injects configurable latency and failures.
+
+    The camera answers POST /capture with a new image of a random known image set, and GET /stream with a stream URL.
+    The analyzer answers any POST with a random assessment.
+    """
+
+    def __init__( self, kind: str, latency: float = 0.0, jitter: float = 0.0, failure_rate: float = 0.0, failure_status: int = 503, image_sets: Optional[List[Tuple[str, str]]] = None, seed: Optional[int] = None ):
+        """Initializes the fake service.
+
+        Args:
+            kind ( str ): The service to imitate: 'camera' or 'analyzer'.
+            latency ( float, optional ): The mean number of seconds each request takes. Defaults to 0.0.
+            jitter ( float, optional ): The standard deviation in seconds of the latency. Defaults to 0.0.
+            failure_rate ( float, optional ): The fraction of requests answered with failure_status. Defaults to 0.0.
+            failure_status ( int, optional ): The status code of failed requests. Defaults to 503.
+            image_sets ( Optional[List[Tuple[str, str]]], optional ): The ( set_id, patient_id ) pairs captured images are assigned to. Defaults to None.
+            seed ( Optional[int], optional ): The random seed. Defaults to None.
+        """
+        if kind not in ( 'camera', 'analyzer' ):
+            raise ValueError( f"Unknown upstream kind '{ kind }'" )
+
+        self.kind = kind
+        self.latency = latency
+        self.jitter = jitter
+        self.failure_rate = failure_rate
+        self.failure_status = failure_status
+        self.image_sets = image_sets or [ ( str( uuid4() ), str( uuid4() ) ) ]
+        self.requests = 0
+        self.__rng = random.Random( seed )
+        self.__lock = Lock()
+        self.__server: Optional[ThreadingHTTPServer] = None
+
+    def __next_outcome( self ) -> Tuple[float, bool]:
+        """Draws the latency and failure of the next request.
+
+        Returns:
+            Tuple[float, bool]: The number of seconds to wait and whether the request fails.
+        """
+        with self.__lock:
+            self.requests += 1
+            delay = max( 0.0, self.__rng.gauss( self.latency, self.jitter ) ) if self.jitter else self.latency
+            return delay, self.__rng.random() < self.failure_rate
+
+    def respond( self, method: str, path: str ) -> Tuple[int, Dict[str, Any]]:
+        """Builds the response to a request.
+
+        Args:
+            method ( str ): The HTTP method.
+            path ( str ): The request path.
+
+        Returns:
+            Tuple[int, Dict[str, Any]]: The status code and the JSON body.
+        """
+        delay, failed = self.__next_outcome()
+        sleep( delay )
+
+        if failed:
+            return self.failure_status, { 'error': 'Injected failure' }
+
+        timestamp = datetime.now( timezone.utc ).replace( tzinfo=None ).isoformat()
+
+        if self.kind == 'analyzer' and method == 'POST':
+            with self.__lock:
+                assessment = self.__rng.random() < 0.1
+            return 200, { 'assessment': assessment, 'assessment_timestamp': timestamp }
+
+        if self.kind == 'camera' and method == 'POST' and path.endswith( '/capture' ):
+            with self.__lock:
+                set_id, patient_id = self.__rng.choice( self.image_sets )
+            return 200, { 'set_id': set_id, 'patient_id': patient_id, 'image_timestamp': timestamp, 'uri': f'https://images.example.com/{ uuid4() }.png' }
+
+        if self.kind == 'camera' and method == 'GET' and path.endswith( '/stream' ):
+            return 200, { 'stream_url': 'rtsp://127.0.0.1/stream' }
+
+        return 404, { 'error': 'Not found' }
+
+    def start( self, host: str = '127.0.0.1', port: int = 0 ) -> str:
+        """Starts serving in a background thread.
+
+        Args:
+            host ( str, optional ): The address to bind. Defaults to '127.0.0.1'.
+            port ( int, optional ): The port to bind, or 0 for a free port. Defaults to 0.
+
+        Returns:
+            str: The base URL of the service.
+        """
+        upstream = self
+
+        class Handler( BaseHTTPRequestHandler ):
+            protocol_version = 'HTTP/1.1'
+            disable_nagle_algorithm = True
+
+            def log_message( self, format: str, *args: Any ):
+                pass
+
+            def __handle( self, method: str ):
+                length = int( self.headers.get( 'Content-Length', 0 ) )
+                if length:
+                    self.rfile.read( length )
+
+                status, body = upstream.respond( method, self.path )
+                data = json.dumps( body ).encode()
+
+                self.send_response( status )
+                self.send_header( 'Content-Type', 'application/json' )
+                self.send_header( 'Content-Length', str( len( data ) ) )
+                self.end_headers()
+                self.wfile.write( data )
+
+            def do_GET( self ):
+                self.__handle( 'GET' )
+
+            def do_POST( self ):
+                self.__handle( 'POST' )
+
+        self.__server = ThreadingHTTPServer( ( host, port ), Handler )
+        self.__server.daemon_threads = True
+        Thread( target=self.__server.serve_forever, daemon=True ).start()
+
+        return f'http://{ host }:{ self.__server.server_address[ 1 ] }'
+
+    def stop( self ):
+        """Stops serving."""
+        if self.__server is not None:
+            self.__server.shutdown()
+            self.__server.server_close()
+            self.__server = None
+
+if __name__ == '__main__':
+    parser = ArgumentParser( description='Runs fake camera and analyzer services for local load testing.' )
+    parser.add_argument( '--camera-port', type=int, default=8001, help='Port of the fake camera service.' )
+    parser.add_argument( '--analyzer-port', type=int, default=8002, help='Port of the fake analyzer service.' )
+    parser.add_argument( '--latency-ms', type=float, default=50, help='Mean latency of every request in milliseconds.' )
+    parser.add_argument( '--jitter-ms', type=float, default=10, help='Standard deviation of the latency in milliseconds.' )
+    parser.add_argument( '--failure-rate', type=float, default=0.0, help='Fraction of requests that fail.' )
+    parser.add_argument( '--seed', type=int, default=None, help='Random seed.' )
+    args = parser.parse_args()
+
+    upstreams = [
+        ( FakeUpstream( kind, args.latency_ms / 1000, args.jitter_ms / 1000, args.failure_rate, seed=args.seed ), port )
+        for kind, port in ( ( 'camera', args.camera_port ), ( 'analyzer', args.analyzer_port ) )
+    ]
+    for upstream, port in upstreams:
+        print( f'Fake { upstream.kind } listening on { upstream.start( port=port ) }' )
+
+    try:
+        while True:
+            sleep( 3600 )
+    except KeyboardInterrupt:
+        for upstream, _ in upstreams:
+            upstream.stop()
@@ -0,0 +1,172 @@
+from argparse import ArgumentParser
+from contextlib import redirect_stdout
+from tempfile import TemporaryDirectory
+from threading import Thread, Lock
+from time import perf_counter
+from typing import Dict, List, Callable, Any
+import json
+import logging
+import os
+import random
+import requests
+import sqlalchemy as sa
+import sys
+sys.path.insert(0, r'./src/')
+sys.path.insert(0, r'./test/')
+from models import _Base, PatientsModel, ImagesModel
+from seed_database import generate_batches, seed_database
+from fake_upstreams import FakeUpstream
+from benchmark_utils import summarize_load, run_metadata
+
+#* NOTE: The app reads its configuration when imported, so it is imported only after the environment points it at
+#* NOTE: the seeded database and the fake upstreams.
+
+Scenario = Callable[[requests.Session, str, random.Random], requests.Response]
+
+def build_scenarios( patient_ids: List[str], image_sets: List[tuple], images: List[tuple] ) -> Dict[str, Scenario]:
+    """Builds the request of every load scenario.
+
+    Args:
+        patient_ids ( List[str] ): The IDs of seeded patients.
+        image_sets ( List[tuple] ): The ( set_id, patient_id ) pairs of seeded image sets.
+        images ( List[tuple] ): The ( image_id, set_id, patient_id ) triples of seeded images.
+
+    Returns:
+        Dict[str, Scenario]: The functions sending one request of each scenario, keyed by scenario name.
+    """
+    return {
+        'list_page': lambda s, url, rng: s.get( f'{ url }/images', params={ 'limit': 100 } ),
+        'get_by_id': lambda s, url, rng: s.get( f'{ url }/patients/{ rng.choice( patient_ids ) }' ),
+        'filter_by_patient': lambda s, url, rng: s.get( f'{ url }/images', params={ 'patient_id': rng.choice( patient_ids ), 'limit': 100 } ),
+        'full_record': lambda s, url, rng: s.get( f'{ url }/patients/{ rng.choice( patient_ids ) }/full' ),
+        'create_patient': lambda s, url, rng: s.post( f'{ url }/patients', json={ 'first_name': 'Load', 'last_name': f'Test{ rng.randrange( 10**6 ) }' } ),
+        'capture_image': lambda s, url, rng: s.post( f'{ url }/images', json={ 'first_name': 'Load', 'last_name': 'Test' } ),
+        'assess_image': lambda s, url, rng: s.post( f'{ url }/assessments', json=dict( zip( ( 'image_id', 'set_id', 'patient_id' ), rng.choice( images ) ) ) ),
+        'assess_image_set': lambda s, url, rng: s.post( f'{ url }/image_sets/{ rng.choice( image_sets )[ 0 ] }/assess' )
+    }
+
+def run_scenario( scenario: Scenario, base_url: str, concurrency: int, duration: float, seed: int ) -> Dict[str, Any]:
+    """Sends requests of a scenario from several threads for a fixed duration.
+
+    Args:
+        scenario ( Scenario ): The function sending one request.
+        base_url ( str ): The base URL of the app.
+        concurrency ( int ): The number of threads, each with its own session.
+        duration ( float ): The number of seconds to send requests for.
+        seed ( int ): The random seed.
+
+    Returns:
+        Dict[str, Any]: The request and error counts, the throughput and the latency percentiles.
+    """
+    latencies: List[float] = []
+    errors = 0
+    lock = Lock()
+    deadline = perf_counter() + duration
+
+    def worker( worker_seed: int ):
+        nonlocal errors
+        rng = random.Random( worker_seed )
+        local_latencies = []
+        local_errors = 0
+
+        with requests.Session() as session:
+            while perf_counter() < deadline:
+                start = perf_counter()
+                try:
+                    failed = scenario( session, base_url, rng ).status_code >= 400
+                except requests.RequestException:
+                    failed = True
+                local_latencies.append( perf_counter() - start )
+                local_errors += failed
+
+        with lock:
+            latencies.extend( local_latencies )
+            errors += local_errors
+
+    start = perf_counter()
+    threads = [ Thread( target=worker, args=( seed + i, ) ) for i in range( concurrency ) ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    return summarize_load( latencies, errors, perf_counter() - start )
+
+def run_load_test( args: Any ) -> Dict[str, Any]:
+    """Seeds a SQLite database, starts the fake upstreams and the app, and runs the selected scenarios.
+
+    Args:
+        args ( Any ): The parsed command line arguments.
+
+    Returns:
+        Dict[str, Any]: The row counts and the results of each scenario.
+    """
+    with TemporaryDirectory() as tmp:
+        db_uri = f'sqlite:///{ tmp }/load_test.db'
+        engine = sa.create_engine( db_uri )
+        _Base.metadata.create_all( engine )
+        counts = seed_database( engine, generate_batches( args.patients, 5000, 2, 10, 1, 0.1, args.seed ), truncate=False )
+
+        with engine.connect() as conn:
+            patient_ids = [ str( uid ) for uid in conn.execute( sa.select( PatientsModel.id ).limit( 1000 ) ).scalars() ]
+            images = [ tuple( str( uid ) for uid in row ) for row in conn.execute( sa.select( ImagesModel.id, ImagesModel.set_id, ImagesModel.patient_id ).limit( 1000 ) ) ]
+        engine.dispose()
+
+        image_sets = sorted( { ( set_id, patient_id ) for _, set_id, patient_id in images } )
+        latency, jitter = args.latency_ms / 1000, args.jitter_ms / 1000
+        camera = FakeUpstream( 'camera', latency, jitter, args.failure_rate, image_sets=image_sets, seed=args.seed )
+        analyzer = FakeUpstream( 'analyzer', latency, jitter, args.failure_rate, seed=args.seed )
+
+        os.environ.update( {
+            'DB_URI': db_uri,
+            'CAMERA_INTERFACE_URL': camera.start(),
+            'AI_INTERFACE_URL': analyzer.start()
+        } )
+
+        from werkzeug.serving import make_server
+        from app import app
+        server = make_server( '127.0.0.1', 0, app, threaded=True )
+        Thread( target=server.serve_forever, daemon=True ).start()
+        base_url = f'http://127.0.0.1:{ server.server_port }'
+
+        scenarios = build_scenarios( patient_ids, image_sets, images )
+        results = {}
+
+        try:
+            for name in args.scenarios or scenarios:
+                results[ name ] = run_scenario( scenarios[ name ], base_url, args.concurrency, args.duration, args.seed )
+                print( f'{ name }: { results[ name ] }', file=sys.stderr )
+        finally:
+            server.shutdown()
+            camera.stop()
+            analyzer.stop()
+
+        results[ 'upstream_requests' ] = { 'camera': camera.requests, 'analyzer': analyzer.requests }
+
+    return { 'rows': counts, 'results': results }
+
+if __name__ == '__main__':
+    parser = ArgumentParser( description='Load tests the app against a seeded SQLite database and fake camera and analyzer services.' )
+    parser.add_argument( '--patients', type=int, default=1000, help='Number of patients to seed, with about 20 images and 20 assessments each.' )
+    parser.add_argument( '--scenarios', type=lambda s: s.split( ',' ), default=None, help='Comma separated scenarios to run. Defaults to all of them.' )
+    parser.add_argument( '--concurrency', type=int, default=8, help='Number of concurrent clients.' )
+    parser.add_argument( '--duration', type=float, default=10, help='Seconds each scenario runs for.' )
+    parser.add_argument( '--latency-ms', type=float, default=50, help='Mean latency of the fake upstreams in milliseconds.' )
+    parser.add_argument( '--jitter-ms', type=float, default=10, help='Standard deviation of the fake upstream latency in milliseconds.' )
+    parser.add_argument( '--failure-rate', type=float, default=0.0, help='Fraction of fake upstream requests that fail.' )
+    parser.add_argument( '--seed', type=int, default=0, help='Random seed.' )
+    parser.add_argument( '--output', default=None, help='File to write the results to, in addition to stdout.' )
+    args = parser.parse_args()
+
+    logging.getLogger( 'werkzeug' ).setLevel( logging.ERROR )
+
+    # The app prints every fetched entry, so its output is discarded during the run
+    with open( os.devnull, 'w' ) as devnull, redirect_stdout( devnull ):
+        results = run_load_test( args )
+
+    report = json.dumps( { 'run': run_metadata( vars( args ) ), **results }, indent=4 )
+    print( report )
+
+    if args.output:
+        with open( args.output, 'w' ) as f:
+            f.write( report )
@@ -0,0 +1,176 @@
+from argparse import ArgumentParser
+from datetime import datetime
+from os import getenv
+from time import perf_counter
+from typing import Dict, List, Any, Iterator
+from dotenv import load_dotenv
+import numpy as np
+import sqlalchemy as sa
+import sys
+sys.path.insert(0, r'./src/')
+from models import PatientsModel, ImageSetsModel, ImagesModel, AssessmentsModel
+
+FIRST_NAMES = np.array( [ 'James', 'Mary', 'Robert', 'Patricia', 'John', 'Jennifer', 'Michael', 'Linda', 'David', 'Elizabeth', 'William', 'Barbara', 'Richard', 'Susan', 'Joseph', 'Jessica' ] )
+LAST_NAMES = np.array( [ 'Smith', 'Johnson', 'Williams', 'Brown', 'Jones', 'Garcia', 'Miller', 'Davis', 'Rodriguez', 'Martinez', 'Hernandez', 'Lopez', 'Gonzalez', 'Wilson', 'Anderson', 'Thomas' ] )
+START_TIMESTAMP = np.datetime64( '2015-01-01T00:00:00', 's' )
+TIMESTAMP_RANGE_SECONDS = 10 * 365 * 24 * 3600
+
+def generate_ids( rng: np.random.Generator, num: int ) -> np.ndarray:
+    """Generates random UUID strings.
+
+    Args:
+        rng ( np.random.Generator ): The random number generator.
+        num ( int ): The number of IDs to generate.
+
+    Returns:
+        np.ndarray: An array of UUID strings.
+    """
+    h = rng.integers( 0, 256, size=( num, 16 ), dtype=np.uint8 ).tobytes().hex()
+    return np.array( [ f'{ h[i:i+8] }-{ h[i+8:i+12] }-{ h[i+12:i+16] }-{ h[i+16:i+20] }-{ h[i+20:i+32] }' for i in range( 0, 32 * num, 32 ) ] )
+
+def generate_timestamps( rng: np.random.Generator, num: int ) -> List[datetime]:
+    """Generates random timestamps within the sample time range.
+
+    Args:
+        rng ( np.random.Generator ): The random number generator.
+        num ( int ): The number of timestamps to generate.
+
+    Returns:
+        List[datetime]: A list of timestamps.
+    """
+    offsets = rng.integers( 0, TIMESTAMP_RANGE_SECONDS, size=num )
+    return ( START_TIMESTAMP + offsets ).astype( 'datetime64[us]' ).tolist()
+
+def to_rows( columns: Dict[str, Any] ) -> List[Dict[str, Any]]:
+    """Converts columnar data into a list of row dictionaries for a Core executemany.
+
+    Args:
+        columns ( Dict[str, Any] ): The column names and their values.
+
+    Returns:
+        List[Dict[str, Any]]: A list of row dictionaries.
+    """
+    names = list( columns )
+    values = [ v.tolist() if isinstance( v, np.ndarray ) else v for v in columns.values() ]
+    return [ dict( zip( names, row ) ) for row in zip( *values ) ]
+
+def generate_batches( num_patients: int, batch_size: int, sets_per_patient: float, images_per_set: float, assessments_per_image: float, positive_rate: float, seed: int ) -> Iterator[Dict[str, Dict[str, Any]]]:
+    """Generates referentially consistent patients, image sets, images and assessments in columnar batches.
+
+    The number of children per parent is Poisson distributed around the given fan-out ratios.
+
+    Args:
+        num_patients ( int ): The total number of patients.
+        batch_size ( int ): The number of patients per batch.
+        sets_per_patient ( float ): The mean number of image sets per patient.
+        images_per_set ( float ): The mean number of images per image set.
+        assessments_per_image ( float ): The mean number of assessments per image.
+        positive_rate ( float ): The fraction of positive assessments.
+        seed ( int ): The random seed.
+
+    Yields:
+        Dict[str, Dict[str, Any]]: The columns of each table for one batch, keyed by table name.
+    """
+    rng = np.random.default_rng( seed )
+
+    for start in range( 0, num_patients, batch_size ):
+        n = min( batch_size, num_patients - start )
+
+        patient_ids = generate_ids( rng, n )
+
+        set_counts = rng.poisson( sets_per_patient, size=n )
+        set_patient_ids = np.repeat( patient_ids, set_counts )
+        set_ids = generate_ids( rng, len( set_patient_ids ) )
+
+        image_counts = rng.poisson( images_per_set, size=len( set_ids ) )
+        image_set_ids = np.repeat( set_ids, image_counts )
+        image_patient_ids = np.repeat( set_patient_ids, image_counts )
+        image_ids = generate_ids( rng, len( image_set_ids ) )
+
+        assessment_counts = rng.poisson( assessments_per_image, size=len( image_ids ) )
+        num_assessments = int( assessment_counts.sum() )
+
+        yield {
+            'patients': {
+                'id': patient_ids,
+                'first_name': rng.choice( FIRST_NAMES, size=n ),
+                'last_name': rng.choice( LAST_NAMES, size=n )
+            },
+            'image_sets': {
+                'id': set_ids,
+                'patient_id': set_patient_ids
+            },
+            'images': {
+                'id': image_ids,
+                'set_id': image_set_ids,
+                'patient_id': image_patient_ids,
+                'image_timestamp': generate_timestamps( rng, len( image_ids ) ),
+                'uri': np.char.add( np.char.add( 'https://images.example.com/', image_ids ), '.png' )
+            },
+            'assessments': {
+                'id': generate_ids( rng, num_assessments ),
+                'image_id': np.repeat( image_ids, assessment_counts ),
+                'set_id': np.repeat( image_set_ids, assessment_counts ),
+                'patient_id': np.repeat( image_patient_ids, assessment_counts ),
+                'assessment_timestamp': generate_timestamps( rng, num_assessments ),
+                'assessment': rng.random( num_assessments ) < positive_rate
+            }
+        }
+
+def seed_database( engine: sa.Engine, batches: Iterator[Dict[str, Dict[str, Any]]], truncate: bool ) -> Dict[str, int]:
+    """Inserts generated batches into the database with Core bulk inserts, one transaction per batch.
+
+    Args:
+        engine ( sa.Engine ): The database engine.
+        batches ( Iterator[Dict[str, Dict[str, Any]]] ): The generated batches.
+        truncate ( bool ): Whether to delete all existing data first.
+
+    Returns:
+        Dict[str, int]: The number of rows inserted per table.
+    """
+    models = { 'patients': PatientsModel, 'image_sets': ImageSetsModel, 'images': ImagesModel, 'assessments': AssessmentsModel }
+    counts = { name: 0 for name in models }
+
+    if truncate:
+        with engine.begin() as conn:
+            for model in reversed( models.values() ):
+                conn.execute( sa.delete( model ) )
+
+    for batch in batches:
+        with engine.begin() as conn:
+            for name, model in models.items():
+                rows = to_rows( batch[ name ] )
+                if rows:
+                    conn.execute( sa.insert( model ), rows )
+                counts[ name ] += len( rows )
+
+        print( f'Inserted { counts }', file=sys.stderr )
+
+    return counts
+
+if __name__ == '__main__':
+    load_dotenv()
+
+    parser = ArgumentParser( description='Seeds the database with high volumes of consistent sample records.' )
+    parser.add_argument( '--db-uri', default=getenv( 'DB_URI' ), help='Database URI. Defaults to the DB_URI environment variable.' )
+    parser.add_argument( '--patients', type=int, default=10000, help='Number of patients.' )
+    parser.add_argument( '--sets-per-patient', type=float, default=2, help='Mean number of image sets per patient.' )
+    parser.add_argument( '--images-per-set', type=float, default=10, help='Mean number of images per image set.' )
+    parser.add_argument( '--assessments-per-image', type=float, default=1, help='Mean number of assessments per image.' )
+    parser.add_argument( '--positive-rate', type=float, default=0.1, help='Fraction of positive assessments.' )
+    parser.add_argument( '--batch-size', type=int, default=5000, help='Number of patients generated and inserted per transaction.' )
+    parser.add_argument( '--seed', type=int, default=0, help='Random seed.' )
+    parser.add_argument( '--truncate', action='store_true', help='Delete all existing data first.' )
+    args = parser.parse_args()
+
+    if not args.db_uri:
+        print( 'No database connection specified.' )
+        exit( 1 )
+
+    start = perf_counter()
+    counts = seed_database(
+        sa.create_engine( args.db_uri ),
+        generate_batches( args.patients, args.batch_size, args.sets_per_patient, args.images_per_set, args.assessments_per_image, args.positive_rate, args.seed ),
+        args.truncate
+    )
+    print( f'Seeded { counts } in { perf_counter() - start:.1f}s' )